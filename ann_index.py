@@ -0,0 +1,140 @@
+import os
+import numpy as np
+import faiss
+
+# Index types
+FLAT = "flat"          # exact search, O(n) per query
+IVF_FLAT = "ivf_flat"  # inverted lists of full vectors; searches nprobe of nlist clusters
+IVF_PQ = "ivf_pq"      # inverted lists of product-quantized codes; smallest memory
+HNSW = "hnsw"          # navigable small-world graph; fastest, most memory, no deletes
+AUTO = "auto"
+KINDS = (FLAT, IVF_FLAT, IVF_PQ, HNSW)
+
+# AUTO keeps the exact index below this many vectors, and only returns to it
+# once an approximate index shrinks below HYSTERESIS of the threshold
+AUTO_THRESHOLD = 50_000
+HYSTERESIS = 0.8
+
+# AUTO picks the fastest index whose estimated size fits this budget
+MEMORY_BUDGET = 4 * 2 ** 30
+
+# Trained indexes need enough vectors to fit their quantizers
+MIN_TRAIN_VECTORS = 10_000
+TRAIN_SAMPLE = 100_000
+
+# Build and search defaults
+NPROBE = 16
+HNSW_M = 32
+EF_CONSTRUCTION = 80
+EF_SEARCH = 64
+PQ_BITS = 8
+
+def config_from_env():
+    """ANN settings from FYPY_ANN_* environment variables, as keyword arguments for select_kind/build_index."""
+    return {
+        "kind": os.getenv("FYPY_ANN_KIND", AUTO),
+        "threshold": int(os.getenv("FYPY_ANN_THRESHOLD", AUTO_THRESHOLD)),
+        "memory_budget": int(float(os.getenv("FYPY_ANN_MEMORY_MB", MEMORY_BUDGET / 2 ** 20)) * 2 ** 20),
+        "nprobe": int(os.getenv("FYPY_ANN_NPROBE", NPROBE)),
+        "ef_search": int(os.getenv("FYPY_ANN_EF_SEARCH", EF_SEARCH)),
+    }
+
+def nlist_for(n):
+    """Number of IVF lists: about 4 * sqrt(n), with at least 39 training vectors per list."""
+    return int(max(1, min(4 * np.sqrt(n), n // 39)))
+
+def pq_subquantizers(dim):
+    """Largest divisor of dim giving sub-vectors of at least 8 dimensions (96 bytes per vector at 768d)."""
+    return max(m for m in range(1, max(dim // 8, 1) + 1) if dim % m == 0)
+
+def estimate_bytes(kind, n, dim, hnsw_m=HNSW_M):
+    """Approximate resident size of an index of n vectors."""
+    centroids = nlist_for(n) * dim * 4
+    if kind == FLAT:
+        return n * dim * 4
+    if kind == IVF_FLAT:
+        return n * (dim * 4 + 8) + centroids
+    if kind == IVF_PQ:
+        return n * (pq_subquantizers(dim) + 8) + centroids + dim * 256 * 4
+    if kind == HNSW:
+        # Level-0 links are 2*M int32s; upper levels add roughly 1/M more
+        return int(n * (dim * 4 + hnsw_m * 2 * 4 * (1 + 1 / hnsw_m)))
+    raise ValueError(f"Unknown index type: {kind}")
+
+def select_kind(n, dim, kind=AUTO, threshold=AUTO_THRESHOLD, memory_budget=MEMORY_BUDGET, current=None, **_):
+    """
+    Index type to use for n vectors. AUTO stays exact below threshold and then takes
+    the fastest of HNSW, IVF-Flat and IVF-PQ that fits memory_budget; `current`, the
+    type in use, keeps small corpus changes around the threshold from rebuilding
+    back and forth. Trained types fall back to the flat index until there are
+    MIN_TRAIN_VECTORS to train on.
+    """
+    if kind not in KINDS + (AUTO,):
+        raise ValueError(f"Unknown index type: {kind}")
+    if kind == AUTO:
+        approximate = current not in (None, FLAT)
+        if n < (threshold * HYSTERESIS if approximate else threshold):
+            return FLAT
+        if approximate and estimate_bytes(current, n, dim) <= memory_budget:
+            return current
+        kind = next((k for k in (HNSW, IVF_FLAT, IVF_PQ) if estimate_bytes(k, n, dim) <= memory_budget), IVF_PQ)
+    if kind in (IVF_FLAT, IVF_PQ) and n < MIN_TRAIN_VECTORS:
+        return FLAT
+    return kind
+
+def index_kind(index):
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return HNSW
+    if isinstance(index, faiss.IndexIVFPQ):
+        return IVF_PQ
+    if isinstance(index, faiss.IndexIVF):
+        return IVF_FLAT
+    return FLAT
+
+def set_search_params(index, nprobe=NPROBE, ef_search=EF_SEARCH, **_):
+    """Apply query-time settings; they are not all persisted by faiss.write_index."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    if isinstance(index, faiss.IndexHNSW) and ef_search:
+        index.hnsw.efSearch = ef_search
+    return index
+
+def build_index(vectors, kind, metric=faiss.METRIC_L2, train_sample=TRAIN_SAMPLE, hnsw_m=HNSW_M,
+                ef_construction=EF_CONSTRUCTION, nprobe=NPROBE, ef_search=EF_SEARCH, seed=0, **_):
+    """
+    Build a faiss index of the given type over vectors (row i gets id i). IVF
+    quantizers are trained on a random sample of at most train_sample vectors.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    if kind == FLAT:
+        index = faiss.IndexFlat(dim, metric)
+    elif kind == HNSW:
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, metric)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        quantizer = faiss.IndexFlat(dim, metric)
+        if kind == IVF_FLAT:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist_for(n), metric)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist_for(n), pq_subquantizers(dim), PQ_BITS, metric)
+        sample = np.random.default_rng(seed).choice(n, size=min(n, train_sample), replace=False)
+        index.train(vectors[np.sort(sample)])
+    if n:
+        index.add(vectors)
+    return set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+
+def empty_like(index):
+    """An empty copy of index that keeps its trained quantizers."""
+    clone = faiss.clone_index(index)
+    clone.reset()
+    return clone
+
+def reconstruct_all(index):
+    """Every stored vector in id order (approximate for IVF-PQ)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal) if index.ntotal else np.empty((0, index.d), dtype=np.float32)
@@ -0,0 +1,150 @@
+import os
+import re
+import time
+import threading
+import numpy as np
+
+# Cosine similarity above which a new question reuses a cached answer
+SIMILARITY_THRESHOLD = 0.92
+
+# Cached answers expire after this many seconds
+TTL_SECONDS = 6 * 3600
+
+# Most answers kept; the least recently used are evicted first
+MAX_ENTRIES = 1000
+
+# Tickers the app shows, recognized in questions in any case; more can be
+# configured with FYPY_ANSWER_CACHE_TICKERS
+TICKERS = ("RELIANCE", "TCS", "HDFC", "INFY", "BTC", "ETH", "SOL", "XRP")
+
+# Figures such as "Q3", "2024" or "15%" and tickers such as "TCS"; questions
+# only match if theirs agree
+_FIGURES = re.compile(r"\b\w*\d[\w.%]*")
+_WORDS = re.compile(r"\b\w+\b")
+
+def config_from_env():
+    """Answer cache settings from FYPY_ANSWER_CACHE_* environment variables, as keyword arguments for AnswerCache."""
+    return {
+        "threshold": float(os.getenv("FYPY_ANSWER_CACHE_THRESHOLD", SIMILARITY_THRESHOLD)),
+        "ttl": float(os.getenv("FYPY_ANSWER_CACHE_TTL", TTL_SECONDS)),
+        "max_entries": int(os.getenv("FYPY_ANSWER_CACHE_SIZE", MAX_ENTRIES)),
+        "tickers": TICKERS + tuple(filter(None, os.getenv("FYPY_ANSWER_CACHE_TICKERS", "").split(","))),
+    }
+
+def _key_terms(question, tickers):
+    """Figures in question, and its words that are known tickers, lowercased."""
+    terms = {match.lower().rstrip(".") for match in _FIGURES.findall(question)}
+    terms.update(word for word in map(str.lower, _WORDS.findall(question)) if word in tickers)
+    return frozenset(terms)
+
+def _version_key(version):
+    # Published versions are zero-padded time stamps; a bare index from before
+    # versioning ("legacy-...") is older than any of them
+    return (not version.startswith("legacy-"), version)
+
+class AnswerCache:
+    """
+    In-memory cache of answers keyed by question embedding, shared by every session.
+
+    get() returns the answer to the most similar cached question whose cosine
+    similarity reaches threshold, provided it was answered from the same index
+    version and mentions the same figures and tickers (so "TCS Q3 revenue"
+    never answers "tcs Q4 revenue" or "INFY Q3 revenue"). Only the given
+    tickers count, matched in any case. Entries expire after ttl seconds; at
+    max_entries the least recently used one is evicted. Seeing a newer index
+    version drops every entry answered from an older one; lookups and stores
+    for an older version, from a session still holding its handle, are skipped.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES, tickers=TICKERS):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._vectors = None  # One unit vector per slot, allocated on first put
+        self._entries = [None] * max_entries
+        self._tickers = frozenset(ticker.strip().lower() for ticker in tickers)
+        self._lock = threading.Lock()
+
+    def _normalize(self, vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, version):
+        """Whether version is the cache's one, after dropping every entry if it is newer."""
+        if self.version is not None and _version_key(version) < _version_key(self.version):
+            return False
+        if version != self.version:
+            live = sum(entry is not None for entry in self._entries)
+            self.invalidations += live
+            self._entries = [None] * self.max_entries
+            self.version = version
+        return True
+
+    def get(self, vector, version, question):
+        """The cached entry (question, answer, sources, similarity) for a near-duplicate question, or None."""
+        now = time.time()
+        with self._lock:
+            if not self._check_version(version):
+                self.misses += 1
+                return None
+            if self._vectors is not None:
+                live = np.fromiter((entry is not None for entry in self._entries), dtype=bool, count=self.max_entries)
+                similarities = np.where(live, self._vectors @ self._normalize(vector), -np.inf)
+                key_terms = _key_terms(question, self._tickers)
+                for slot in np.argsort(-similarities):
+                    if similarities[slot] < self.threshold:
+                        break
+                    entry = self._entries[slot]
+                    if now - entry["created"] > self.ttl:
+                        self._entries[slot] = None
+                        self.expirations += 1
+                    elif entry["key_terms"] == key_terms:
+                        entry["last_used"] = now
+                        self.hits += 1
+                        return {"question": entry["question"], "answer": entry["answer"],
+                                "sources": entry["sources"], "similarity": float(similarities[slot])}
+            self.misses += 1
+            return None
+
+    def put(self, vector, version, question, answer, sources=""):
+        now = time.time()
+        vector = self._normalize(vector)
+        with self._lock:
+            if not self._check_version(version):
+                return
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_entries
+            slot = next((i for i, entry in enumerate(self._entries) if entry is None), None)
+            if slot is None:
+                expired = [i for i, entry in enumerate(self._entries) if now - entry["created"] > self.ttl]
+                for i in expired:
+                    self._entries[i] = None
+                self.expirations += len(expired)
+                if expired:
+                    slot = expired[0]
+                else:
+                    slot = min(range(self.max_entries), key=lambda i: self._entries[i]["last_used"])
+                    self.evictions += 1
+            self._vectors[slot] = vector
+            self._entries[slot] = {"question": question, "answer": answer, "sources": sources,
+                                   "key_terms": _key_terms(question, self._tickers), "created": now, "last_used": now}
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': sum(entry is not None for entry in self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'expired': self.expirations,
+            'invalidated': self.invalidations,
+        }
@@ -0,0 +1,116 @@
+import re
+import time
+import queue
+import threading
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Tag on the LLM step whose output is the answer shown to the user; the
+# question-extraction steps of the map-reduce chain are not streamed
+ANSWER_TAG = "fypy-answer"
+
+# RetrievalQAWithSourcesChain splits the answer from its sources on this marker
+SOURCES_MARKER = re.compile(r"SOURCES?:", re.IGNORECASE)
+
+_DONE = object()
+
+def tag_answer_step(chain):
+    """Tag the final combine step of a RetrievalQAWithSourcesChain built with from_llm."""
+    combine = chain.combine_documents_chain
+    combine = getattr(combine, "reduce_documents_chain", combine)
+    llm_chain = getattr(combine, "combine_documents_chain", combine).llm_chain
+    llm_chain.tags = list(dict.fromkeys((llm_chain.tags or []) + [ANSWER_TAG]))
+    return chain
+
+def visible_text(text):
+    """The part of a partial answer shown while it streams, without the trailing sources list."""
+    return SOURCES_MARKER.split(text, maxsplit=1)[0].rstrip()
+
+class _TokenQueue(BaseCallbackHandler):
+    """Forwards the answer step's tokens, timestamped, from the chain's thread."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.answer_chains = set()
+        self.answer_runs = set()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, tags=None, **kwargs):
+        # A chain's own tags are not inherited by its LLM call, so match on the parent run
+        if ANSWER_TAG in (tags or ()):
+            self.answer_chains.add(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, **kwargs):
+        if parent_run_id in self.answer_chains or ANSWER_TAG in (tags or ()):
+            self.answer_runs.add(run_id)
+            self.tokens.put((run_id, None, time.perf_counter()))
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if run_id in self.answer_runs:
+            self.tokens.put((run_id, token, time.perf_counter()))
+
+class StreamingAnswer:
+    """
+    Runs a QA chain on a background thread and yields the answer text as its
+    tokens arrive. Iterating yields the answer so far after each token (a new
+    answer step, e.g. after the chain collapses long inputs, starts over);
+    afterwards `result` holds the chain's output and stats() the timings.
+
+    With an LLM that does not stream, iteration ends without yielding and the
+    whole answer is only available from `result`.
+    """
+
+    def __init__(self, chain, question):
+        self.result = None
+        self.error = None
+        self.text = ""
+        self.tokens = 0
+        self.first_token_seconds = None
+        self.total_seconds = None
+        self._answer_start = None
+        self._last_token = None
+        self._queue = queue.Queue()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, args=(chain, question), daemon=True)
+        self._thread.start()
+
+    def _run(self, chain, question):
+        try:
+            self.result = chain.invoke({"question": question}, config={"callbacks": [_TokenQueue(self._queue)]},
+                                       return_only_outputs=True)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.total_seconds = time.perf_counter() - self._start
+            self._queue.put(_DONE)
+
+    def __iter__(self):
+        run = None
+        while (item := self._queue.get()) is not _DONE:
+            run_id, token, at = item
+            if run_id != run:
+                run, self.text, self.tokens, self._answer_start = run_id, "", 0, at
+            if not token:  # The answer step's start, or an empty closing chunk
+                continue
+            if self.first_token_seconds is None:
+                self.first_token_seconds = at - self._start
+            self.text += token
+            self.tokens += 1
+            self._last_token = at
+            yield self.text
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def tokens_per_second(self):
+        """Generation rate of the answer step, from its start to its last token."""
+        if not self.tokens or self._last_token <= self._answer_start:
+            return None
+        return self.tokens / (self._last_token - self._answer_start)
+
+    def stats(self):
+        return {
+            'ttft_s': round(self.first_token_seconds, 3) if self.first_token_seconds is not None else None,
+            'tokens': self.tokens,
+            'tokens_per_s': round(self.tokens_per_second, 1) if self.tokens_per_second else None,
+            'total_s': round(self.total_seconds, 3) if self.total_seconds is not None else None,
+        }
@@ -0,0 +1,89 @@
+"""
+Benchmark recall@k against latency for the ANN index types.
+
+Draws clustered, unit-length vectors shaped like sentence embeddings, builds
+each index type from ann_index, and sweeps nprobe (IVF) and efSearch (HNSW).
+Reports build time, serialized size, recall@k against the exact flat index,
+median single-query latency and batch throughput, plus the estimated size of
+each type at the target corpus size.
+
+Run from the repository root:
+    python -m benchmarks.bench_ann [--n 200000] [--dim 768] [--k 4] [--target 1000000]
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+import ann_index
+from ann_index import FLAT, IVF_FLAT, IVF_PQ, HNSW
+
+SWEEPS = {
+    FLAT: [{}],
+    IVF_FLAT: [{"nprobe": p} for p in (1, 4, 16, 64)],
+    IVF_PQ: [{"nprobe": p} for p in (1, 4, 16, 64)],
+    HNSW: [{"ef_search": ef} for ef in (16, 32, 64, 128, 256)],
+}
+
+
+def clustered_vectors(n, dim, n_clusters, seed=0, spread=0.35):
+    """Unit vectors scattered around random topic directions."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = centers[rng.integers(0, n_clusters, size=n)]
+    vectors = vectors + rng.standard_normal((n, dim)).astype(np.float32) * spread / np.sqrt(dim) * 4
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=200_000, help="Corpus size (vectors)")
+    parser.add_argument("--dim", type=int, default=768, help="Vector dimension (all-mpnet-base-v2: 768)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=4, help="Neighbours per query (the retriever's default is 4)")
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--target", type=int, default=1_000_000, help="Corpus size for the memory projection")
+    parser.add_argument("--kinds", nargs="+", default=list(SWEEPS), choices=list(SWEEPS))
+    args = parser.parse_args()
+
+    data = clustered_vectors(args.n + args.queries, args.dim, args.clusters)
+    corpus, queries = data[:args.n], data[args.n:]
+    print(f"{args.n} x {args.dim} corpus, {args.queries} queries, k={args.k}, {faiss.omp_get_max_threads()} threads")
+
+    exact = ann_index.build_index(corpus, FLAT)
+    _, truth = exact.search(queries, args.k)
+
+    print(f"\n{'index':<10} {'setting':<14} {'build s':>8} {'size MiB':>9} {'recall':>7} "
+          f"{'p50 ms':>8} {'batch qps':>10} {f'est. MiB @ {args.target:,}':>18}")
+    for kind in args.kinds:
+        start = time.perf_counter()
+        index = exact if kind == FLAT else ann_index.build_index(corpus, kind)
+        build_seconds = time.perf_counter() - start
+        size_mib = len(faiss.serialize_index(index)) / 2 ** 20
+        projected_mib = ann_index.estimate_bytes(kind, args.target, args.dim) / 2 ** 20
+        for params in SWEEPS[kind]:
+            ann_index.set_search_params(index, **params)
+            latencies = []
+            for query in queries[:200]:
+                start = time.perf_counter()
+                index.search(query[None, :], args.k)
+                latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            _, found = index.search(queries, args.k)
+            qps = len(queries) / (time.perf_counter() - start)
+            setting = ", ".join(f"{key}={value}" for key, value in params.items()) or "exact"
+            print(f"{kind:<10} {setting:<14} {build_seconds:>8.1f} {size_mib:>9.1f} {recall_at_k(found, truth):>7.3f} "
+                  f"{np.median(latencies) * 1000:>8.3f} {qps:>10.0f} {projected_mib:>18,.0f}")
+
+    chosen = ann_index.select_kind(args.target, args.dim)
+    print(f"\nAUTO at {args.target:,} vectors with a {ann_index.MEMORY_BUDGET / 2 ** 30:.0f} GiB budget selects: {chosen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark the multi-horizon prediction evaluation on large prediction logs.
+
+Builds a synthetic price history and a prediction log sampled from it, times
+evaluate_horizons and summarize_hit_rates, and spot-checks the as-of join
+against a per-row lookup.
+
+Run from the repository root:
+    python -m benchmarks.bench_crypto_evaluation [--rows 100000 1000000] [--coins 5000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_crypto_features import make_combined_data
+from pages.crypto import build_price_history, evaluate_horizons, summarize_hit_rates, EVALUATION_HORIZONS
+
+
+def make_prediction_log(history, n_rows, seed=0):
+    """Sample predictions from the history, as retrain_model would have logged them."""
+    rng = np.random.default_rng(seed)
+    picks = history.iloc[rng.integers(0, len(history), size=n_rows)]
+    clusters = rng.integers(0, 3, size=n_rows)
+    return pd.DataFrame({
+        'Coin': picks['Coin'].values,
+        'price': picks['price'].values,
+        'prediction_date': picks['date'].values,
+        'date': picks['date'].values + np.timedelta64(1, 'h'),
+        'Cluster': clusters,
+        'Probability_Group': np.array(['90% Uptrend', '80% Uptrend', '70% Uptrend'])[clusters],
+    })
+
+
+def realized_price_lookup(history, coin, target):
+    """Reference per-row lookup: last price at or before target, if target is within the history."""
+    coin_history = history[history['Coin'] == coin]
+    if coin_history.empty or target > coin_history['date'].max():
+        return np.nan
+    before = coin_history[coin_history['date'] <= target]
+    return before['price'].iloc[-1] if not before.empty else np.nan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--check", type=int, default=200, help="Rows spot-checked against the per-row lookup.")
+    args = parser.parse_args()
+
+    history = build_price_history(make_combined_data(args.coins))
+    print(f"price history: {len(history)} rows for {args.coins} coins")
+    print(f"{'predictions':>12} {'evaluate (s)':>13} {'summarize (s)':>14}")
+    for n_rows in args.rows:
+        predictions = make_prediction_log(history, n_rows)
+
+        start = time.perf_counter()
+        evaluated = evaluate_horizons(predictions, history)
+        eval_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summarize_hit_rates(evaluated, 'Probability_Group')
+        summarize_hit_rates(evaluated, 'Cluster')
+        summary_time = time.perf_counter() - start
+        print(f"{n_rows:>12} {eval_time:>13.3f} {summary_time:>14.3f}")
+
+        for i in np.random.default_rng(1).integers(0, n_rows, size=min(args.check, n_rows)):
+            row = predictions.iloc[i]
+            for h in EVALUATION_HORIZONS:
+                expected = realized_price_lookup(history, row['Coin'], row['prediction_date'] + pd.Timedelta(days=h))
+                actual = evaluated[f'Actual_Price_{h}d'].iloc[i]
+                assert (np.isnan(expected) and np.isnan(actual)) or np.isclose(expected, actual), (i, h)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark the memecoin feature extraction at several universe sizes.
+
+Compares the per-coin extract_features loop used by retrain_model before
+with the grouped extract_all_features pass, and checks both give the same
+feature rows.
+
+Run from the repository root:
+    python -m benchmarks.bench_crypto_features [--sizes 1000 10000 50000] [--loop-limit 10000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pages.crypto import extract_features, extract_all_features, FEATURE_COLUMNS
+
+
+def make_combined_data(n_coins, max_days=90, seed=0):
+    """
+    Build a synthetic memecoin workbook in the shape load_data returns:
+    a MultiIndex (Coin, Index) frame with date/price/market_cap/volume columns.
+    """
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_days + 1, size=n_coins)
+    total = int(lengths.sum())
+    coin_ids = np.repeat(np.arange(n_coins), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    end_dates = pd.Timestamp("2025-02-04") - pd.to_timedelta(rng.integers(0, 5, size=n_coins), unit="D")
+    dates = np.repeat(end_dates.values, lengths) - pd.to_timedelta(np.repeat(lengths, lengths) - 1 - offsets, unit="D").values
+
+    # Per-coin geometric random walks
+    steps = rng.normal(0, 0.08, size=total)
+    log_paths = pd.Series(steps).groupby(coin_ids).cumsum().values
+    base = np.repeat(10 ** rng.uniform(-8, 3, size=n_coins), lengths)
+    prices = base * np.exp(log_paths)
+    prices[rng.random(total) < 0.01] = np.nan
+
+    market_cap = prices * np.repeat(10 ** rng.uniform(6, 9, size=n_coins), lengths) / base
+    volume = market_cap * rng.uniform(0.001, 0.2, size=total)
+    volume[rng.random(total) < 0.05] = np.nan
+
+    names = np.array([f"coin{i}" for i in range(n_coins)])
+    data = pd.DataFrame({
+        "date": pd.to_datetime(dates),
+        "price": prices,
+        "market_cap": market_cap,
+        "volume": volume,
+        "token": np.repeat(np.char.upper(names), lengths),
+        "platform": np.repeat(rng.choice(["solana", "ethereum", "base"], size=n_coins), lengths),
+    })
+    data.index = pd.MultiIndex.from_arrays([names[coin_ids], offsets], names=["Coin", "Index"])
+    return data
+
+
+def extract_features_loop(combined_data):
+    """The per-coin loop retrain_model used before extract_all_features."""
+    feature_data = []
+    for coin, coin_data in combined_data.groupby(level=0):
+        features = extract_features(coin_data)
+        if features:
+            features['Coin'] = coin
+            feature_data.append(features)
+    return pd.DataFrame(feature_data)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--loop-limit", type=int, default=10000,
+                        help="Skip the slow per-coin loop above this many coins.")
+    args = parser.parse_args()
+
+    print(f"{'coins':>8} {'rows':>10} {'loop (s)':>10} {'vectorized (s)':>15} {'speedup':>8}")
+    for n_coins in args.sizes:
+        combined_data = make_combined_data(n_coins)
+        vectorized, vec_time = timed(extract_all_features, combined_data)
+
+        loop_time = float("nan")
+        if n_coins <= args.loop_limit:
+            looped, loop_time = timed(extract_features_loop, combined_data)
+            pd.testing.assert_frame_equal(
+                vectorized[FEATURE_COLUMNS + ['Coin']].reset_index(drop=True),
+                looped[FEATURE_COLUMNS + ['Coin']].reset_index(drop=True),
+                check_dtype=False,
+            )
+
+        print(f"{n_coins:>8} {len(combined_data):>10} {loop_time:>10.3f} {vec_time:>15.3f} {loop_time / vec_time:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
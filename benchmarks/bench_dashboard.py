@@ -0,0 +1,88 @@
+"""
+Benchmark moving the Dashboard's "Select Day to Highlight" slider.
+
+Before, every move reran the whole page, regenerating the portfolio series
+and rebuilding its Plotly figure. Now the series and base figure come from
+figure_cache and the slider lives in the portfolio_chart fragment, so a move
+reruns only that fragment. Each layout runs in Streamlit's headless AppTest:
+the server time of a slider move, and the bytes of the elements it sends,
+are those of a full page rerun before and of a portfolio_chart rerun now
+(AppTest always reruns the whole script, so the fragment is run as the
+script on its own).
+
+Run from the repository root:
+    python -m benchmarks.bench_dashboard [--moves 20]
+"""
+import argparse
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+def legacy_page():
+    import plotly.graph_objects as go
+    import streamlit as st
+    import pages.dashboard as dashboard
+    from utils import generate_time_series
+
+    def legacy_portfolio_chart(start, end):
+        """The Portfolio Performance chart as it was before figure_cache."""
+        df = generate_time_series(start, end, dashboard.PORTFOLIO_BASE, dashboard.PORTFOLIO_TREND)
+        idx = st.slider("Select Day to Highlight", 0, len(df)-1, 10)
+        sel_date = df.iloc[idx]['Date']
+        sel_val = df.iloc[idx]['Value']
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=df['Date'], y=df['Value'], mode='lines', name='Portfolio Value',
+                                 line=dict(color='#3b82f6', width=2),
+                                 hovertemplate='Date: %{x|%b %d, %Y}<br>Value: ₹%{y:,.0f}<extra></extra>'))
+        fig.add_vline(x=sel_date, line_width=2, line_dash="dot", line_color="orange")
+        fig.add_annotation(x=sel_date, y=sel_val, text=f"₹{sel_val:,.0f}", showarrow=True, arrowhead=1, ax=40, ay=-40)
+        fig.update_layout(
+            plot_bgcolor='white', paper_bgcolor='white', margin=dict(t=20, l=20, r=20, b=20),
+            xaxis=dict(showgrid=True, gridcolor='#e5e5e5', title='Date', title_font=dict(color='black', size=14),
+                       tickfont=dict(color='black')),
+            yaxis=dict(showgrid=True, gridcolor='#e5e5e5', title='Portfolio Value (₹)',
+                       title_font=dict(color='black', size=14), tickfont=dict(color='black'), tickprefix='₹'))
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+    dashboard.portfolio_chart = legacy_portfolio_chart
+    dashboard.render()
+
+
+def fragment_only():
+    import pages.dashboard as dashboard
+    dashboard.portfolio_chart(*dashboard.PORTFOLIO_RANGE)
+
+
+def payload(node):
+    """Bytes of the element protos under node."""
+    size = node.proto.ByteSize() if getattr(node, "proto", None) is not None and not hasattr(node, "children") else 0
+    return size + sum(payload(child) for child in getattr(node, "children", {}).values())
+
+
+def measure(app, moves):
+    at = AppTest.from_function(app, default_timeout=60).run()
+    assert not at.exception, at.exception
+    seconds = 0.0
+    for move in range(moves):
+        next(slider for slider in at.slider if slider.label == "Select Day to Highlight").set_value(move % 70)
+        start = time.perf_counter()
+        at.run()
+        seconds += time.perf_counter() - start
+        assert not at.exception, at.exception
+    return seconds / moves, payload(at._tree)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--moves", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'per slider move':<34} {'server ms':>9} {'KiB sent':>9}")
+    for name, app in (("before: full page rerun", legacy_page), ("after: portfolio_chart fragment", fragment_only)):
+        seconds, size = measure(app, args.moves)
+        print(f"{name:<34} {seconds * 1000:>9.1f} {size / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark loading a published index with the pickled and the SQLite docstore.
+
+Builds flat indexes of random vectors over synthetic 300-character chunks,
+saves each both ways (FAISS.save_local's index.pkl and vector_index's
+docstore.db), and reports load time, resident memory added by the load and
+query latency for k=4 hits. A small --dim keeps the faiss index itself from
+dominating, so the numbers mostly show the docstore.
+
+Run from the repository root:
+    python -m benchmarks.bench_docstore [--sizes 10000 100000 300000] [--dim 64]
+"""
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+import faiss
+import numpy as np
+import psutil
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import vector_index
+
+WORDS = "revenue profit margin growth quarter guidance shares market dividend outlook demand earnings".split()
+
+
+def make_store(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    index = faiss.IndexFlatL2(dim)
+    index.add(vectors)
+    ids = [f"{i:032x}" for i in range(n)]
+    words = rng.choice(WORDS, size=(n, 40))
+    documents = {doc_id: Document(page_content=" ".join(row)[:300],
+                                  metadata={"source": f"https://example.com/article/{i // 20}", "chunk_hash": doc_id})
+                 for i, (doc_id, row) in enumerate(zip(ids, words))}
+    store = FAISS(DeterministicFakeEmbedding(size=dim), index, InMemoryDocstore(documents), dict(enumerate(ids)))
+    return store, vectors
+
+
+def rss_mib():
+    return psutil.Process().memory_info().rss / 2 ** 20
+
+
+def measure(load, queries, k=4):
+    gc.collect()
+    before = rss_mib()
+    start = time.perf_counter()
+    store = load()
+    load_seconds = time.perf_counter() - start
+    rss_delta = rss_mib() - before
+    start = time.perf_counter()
+    for query in queries:
+        hits = store.similarity_search_with_score_by_vector(query, k=k)
+        assert len(hits) == k and all(isinstance(doc, Document) for doc, _ in hits)
+    query_ms = (time.perf_counter() - start) / len(queries) * 1000
+    del store
+    return load_seconds, rss_delta, query_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    embeddings = DeterministicFakeEmbedding(size=args.dim)
+    print(f"{'chunks':>8} {'format':<8} {'disk MiB':>9} {'load s':>8} {'RSS +MiB':>9} {'query ms':>9}")
+    for n in args.sizes:
+        store, vectors = make_store(n, args.dim)
+        queries = [list(map(float, row)) for row in vectors[:args.queries]]
+        directory = tempfile.mkdtemp()
+        try:
+            pickled, sqlite = os.path.join(directory, "pickled"), os.path.join(directory, "sqlite")
+            store.save_local(pickled)
+            vector_index._save(store, sqlite)
+            del store
+            for name, path, load in (
+                    ("pickle", pickled, lambda: FAISS.load_local(pickled, embeddings, allow_dangerous_deserialization=True)),
+                    ("sqlite", sqlite, lambda: vector_index._open(sqlite, embeddings))):
+                disk = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2 ** 20
+                load_seconds, rss_delta, query_ms = measure(load, queries)
+                print(f"{n:>8} {name:<8} {disk:>9.1f} {load_seconds:>8.3f} {rss_delta:>9.1f} {query_ms:>9.3f}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark and check downsampling of long line-chart series.
+
+Draws a minute-by-minute random walk of --points points (about two years of
+intraday data at the default 1M) and, for the whole range and for zoomed
+windows, times downsample.downsample with each method plus the figure
+serialization st.plotly_chart does, against sending every point. Also checks
+that the first, last, minimum and maximum visible points are always kept and
+that min-max bucketing keeps the extremes of every bucket; the script exits
+non-zero if any check fails.
+
+Run from the repository root:
+    python -m benchmarks.bench_downsample [--points 1000000] [--width 1200]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+
+import downsample
+from utils import generate_series, RANDOM_WALK
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def serialize(x, y):
+    """Build and serialize a line figure as st.plotly_chart does; returns its JSON size in bytes."""
+    fig = go.Figure(go.Scatter(x=x, y=y, mode='lines'))
+    return len(pio.to_json(plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)))
+
+
+def check_extremes(x, y, kept, x_range):
+    """Assert kept holds the first, last, minimum and maximum points of (x, y) inside x_range."""
+    first, stop = downsample.visible(x, x_range)
+    window = y[first:stop]
+    for name, position in (("first", first), ("last", stop - 1),
+                           ("minimum", first + window.argmin()), ("maximum", first + window.argmax())):
+        assert position in kept, f"{name} visible point {position} dropped"
+    assert np.all(np.diff(kept) > 0), "indices not sorted and unique"
+
+
+def check_buckets(y, n_out):
+    """Assert minmax_indices keeps the minimum and maximum of every bucket."""
+    kept = downsample.minmax_indices(y, n_out)
+    buckets = max(1, (n_out - 2) // 2)
+    size = -(-(len(y) - 2) // buckets)
+    for start in range(1, len(y) - 1, size):
+        bucket = y[start:min(start + size, len(y) - 1)]
+        assert start + bucket.argmin() in kept and start + bucket.argmax() in kept, f"bucket at {start} lost an extreme"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    dates = pd.date_range("2024-01-01", periods=args.points, freq="min")
+    values = generate_series(1, args.points, 3200000, noise=0.001, model=RANDOM_WALK, seed=args.seed)[0]
+    # Spikes a coarse sampler would step over
+    values[args.points // 3] += 500000
+    values[2 * args.points // 3] -= 500000
+
+    (_, full_bytes), full_seconds = timed(lambda: ((), serialize(dates, values)))
+    print(f"{args.points:,} points, chart {args.width} px wide ({downsample.points_for(args.width):,} points)")
+    print(f"{'view':<14} {'method':<8} {'visible':>10} {'drawn':>7} {'downsample ms':>14} {'figure ms':>10} {'KiB':>9}")
+    print(f"{'all':<14} {'none':<8} {args.points:>10,} {args.points:>7,} {0:>14.1f} {full_seconds * 1000:>10.1f} {full_bytes / 1024:>9.1f}")
+
+    spans = {"all": None, "1 week": pd.Timedelta(days=7), "1 day": pd.Timedelta(days=1), "1 hour": pd.Timedelta(hours=1)}
+    middle = dates[args.points // 2]
+    for view, span in spans.items():
+        x_range = None if span is None else (middle - span / 2, middle + span / 2)
+        for method in downsample.METHODS:
+            kept, seconds = timed(lambda: downsample.downsample(dates, values, x_range, args.width, method))
+            check_extremes(dates, values, kept, x_range)
+            size, figure_seconds = timed(lambda: serialize(dates[kept], values[kept]))
+            first, stop = downsample.visible(dates, x_range)
+            print(f"{view:<14} {method:<8} {stop - first:>10,} {len(kept):>7,} {seconds * 1000:>14.1f} "
+                  f"{figure_seconds * 1000:>10.1f} {size / 1024:>9.1f}")
+
+    for n_out in (4, 5, 101, 2400):
+        check_buckets(values, n_out)
+    check_buckets(values[:1001], 40)
+    print("\nfirst, last, minimum and maximum visible points kept in every view; min-max keeps every bucket's extremes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark embedding throughput configurations on a fixed corpus.
+
+Builds a deterministic corpus of article-like paragraphs, splits it with the
+bot's RecursiveCharacterTextSplitter settings, and embeds it with a plain
+sentence-transformers encode (the HuggingFaceEmbeddings default) and with
+TunedEmbeddings under several batch, thread and precision settings. Reports
+chunks/sec, speedup and the worst cosine similarity to the float32 baseline.
+
+Run from the repository root:
+    python -m benchmarks.bench_embeddings [--model sentence-transformers/all-mpnet-base-v2] [--chunks 2000]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from embedding_backend import TunedEmbeddings, BFLOAT16, INT8
+
+WORDS = ("revenue profit margin growth quarter guidance shares market index rose fell sharply "
+         "analysts expect dividend buyback outlook demand supply earnings per share crore lakh "
+         "the company said in a statement that its board approved results for the period").split()
+
+
+def make_corpus(n_chunks, seed=0):
+    """Split synthetic articles with mixed paragraph lengths into about n_chunks chunks."""
+    rng = np.random.default_rng(seed)
+    splitter = RecursiveCharacterTextSplitter(separators=["\n\n", "\n", ".", ","], chunk_size=300, chunk_overlap=20)
+    chunks = []
+    while len(chunks) < n_chunks:
+        paragraphs = [" ".join(rng.choice(WORDS, size=rng.integers(4, 80))) + "." for _ in range(rng.integers(3, 15))]
+        chunks.extend(splitter.split_text("\n\n".join(paragraphs)))
+    return chunks[:n_chunks]
+
+
+def configurations(threads):
+    yield "tuned", {}
+    yield "unsorted", {"sort_by_length": False}
+    yield "batch=8", {"batch_size": 8}
+    yield "batch=128", {"batch_size": 128, "max_batch_tokens": 16384}
+    for n in sorted({1, threads}):
+        yield f"threads={n}", {"threads": n}
+    yield BFLOAT16, {"precision": BFLOAT16}
+    yield INT8, {"precision": INT8}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="sentence-transformers/all-mpnet-base-v2")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=1, help="Timed passes per configuration (best is kept)")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    corpus = make_corpus(args.chunks)
+    texts = [text.replace("\n", " ") for text in corpus]
+    print(f"{len(corpus)} chunks, mean {np.mean([len(t) for t in corpus]):.0f} chars, model {args.model}")
+
+    model = SentenceTransformer(args.model, device="cpu")
+    model.encode(texts[:32])  # Warm up
+
+    def best_of(func):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
+
+    reference, base_seconds = best_of(lambda: model.encode(texts, batch_size=32, show_progress_bar=False))
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    print(f"\n{'configuration':<16} {'chunks/s':>9} {'speedup':>8} {'min cosine':>11}")
+    print(f"{'baseline':<16} {len(texts) / base_seconds:>9.1f} {1.0:>8.2f} {1.0:>11.6f}")
+
+    for name, config in configurations(os.cpu_count() or 1):
+        # Each configuration loads its own model, so quantization never leaks into the next one
+        embeddings = TunedEmbeddings(args.model, **config)
+        vectors, seconds = best_of(lambda: np.asarray(embeddings.embed_documents(corpus), dtype=np.float32))
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        cosine = float((vectors * reference).sum(axis=1).min())
+        print(f"{name:<16} {len(texts) / seconds:>9.1f} {base_seconds / seconds:>8.2f} {cosine:>11.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark holdings rendering: per-row st.columns widgets against the paginated grid.
+
+Runs each layout in Streamlit's headless AppTest with synthetic positions and
+reports the time of a warm rerun, the number of elements it produces and the
+bytes of those elements. The per-row layout is the one the holdings pages used
+before holdings_grid: six columns and several writes per row, with a Plotly
+micro chart from generate_micro_chart. It is only run up to --legacy-limit
+rows.
+
+Run from the repository root:
+    python -m benchmarks.bench_holdings_grid [--rows 100 1000 10000] [--legacy-limit 300]
+"""
+import argparse
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+def per_row_app(n):
+    import numpy as np
+    import pandas as pd
+    import streamlit as st
+    from utils import generate_micro_chart
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Name": [f"SYM{i}" for i in range(n)], "Price": rng.uniform(10, 5000, n).round(2),
+                       "Change": rng.normal(0, 2, n).round(2), "Low": rng.uniform(10, 5000, n).round(2),
+                       "Quantity": rng.integers(1, 500, n)})
+    for _, row in df.iterrows():
+        cols = st.columns([2, 2, 2, 2, 2, 2])
+        with cols[0]:
+            st.write(f"{row['Name']}")
+            st.write(f"Qty: {row['Quantity']}")
+        with cols[1]:
+            st.write(f"₹{row['Price']}")
+        color = "green" if row["Change"] >= 0 else "red"
+        with cols[2]:
+            st.markdown(f"<span style='color:{color};'>{row['Change']}%</span>", unsafe_allow_html=True)
+        with cols[3]:
+            st.write(f"₹{row['Low']}")
+        with cols[4]:
+            st.plotly_chart(generate_micro_chart(), use_container_width=False, config={"displayModeBar": False})
+        with cols[5]:
+            st.markdown("Trade")
+        st.markdown("---")
+
+
+def grid_app(n):
+    import numpy as np
+    import pandas as pd
+    from holdings_grid import render_grid
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Name": [f"SYM{i}" for i in range(n)], "Price": rng.uniform(10, 5000, n).round(2),
+                       "Change": rng.normal(0, 2, n).round(2), "Low": rng.uniform(10, 5000, n).round(2),
+                       "Quantity": rng.integers(1, 500, n)})
+    render_grid(df, "bench", change_column="Change")
+
+
+def count_elements(node):
+    children = getattr(node, "children", {})
+    return len(children) + sum(count_elements(child) for child in children.values())
+
+
+def payload(node):
+    """Bytes of the element protos under node."""
+    size = node.proto.ByteSize() if getattr(node, "proto", None) is not None and not hasattr(node, "children") else 0
+    return size + sum(payload(child) for child in getattr(node, "children", {}).values())
+
+
+def measure(app, n):
+    at = AppTest.from_function(app, args=(n,), default_timeout=600).run()
+    start = time.perf_counter()
+    at.run()
+    seconds = time.perf_counter() - start
+    assert not at.exception, at.exception
+    return seconds, count_elements(at._tree), payload(at._tree)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--legacy-limit", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'layout':<10} {'rerun ms':>9} {'elements':>9} {'KiB':>9}")
+    for n in args.rows:
+        layouts = [("grid", grid_app)] + ([("per-row", per_row_app)] if n <= args.legacy_limit else [])
+        for name, app in layouts:
+            seconds, elements, size = measure(app, n)
+            print(f"{n:>6} {name:<10} {seconds * 1000:>9.1f} {elements:>9} {size / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark article ingestion against a local stand-in HTTP server.
+
+Serves synthetic articles with a configurable response delay, plus one page
+that never answers in time, and compares fetching them one after another (as
+UnstructuredURLLoader does) with ingestion.ingest. Parsed texts must match.
+
+Run from the repository root:
+    python -m benchmarks.bench_ingestion [--articles 200] [--delay 0.2] [--timeout 2]
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from ingestion import ingest, html_to_text
+
+SLOW_PATH = "/slow"
+
+
+def article_html(n, paragraphs=20):
+    body = "".join(f"<p>Article {n}, paragraph {p}: revenue rose {n + p}% on strong demand.</p>" for p in range(paragraphs))
+    return f"<html><head><title>Article {n}</title><script>var x = 1;</script></head><body><h1>Article {n}</h1>{body}</body></html>"
+
+
+def make_handler(delay, stall):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(stall if self.path == SLOW_PATH else delay)
+            if self.path == SLOW_PATH or self.path.startswith("/article/"):
+                n = 0 if self.path == SLOW_PATH else int(self.path.rsplit("/", 1)[1])
+                payload = article_html(n).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up on the stalled page
+            else:
+                self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # The default backlog of 5 drops bursts of connections
+
+
+def start_server(delay, stall):
+    server = StandInServer(("127.0.0.1", 0), make_handler(delay, stall))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch_sequential(urls, timeout):
+    """One URL after another, as UnstructuredURLLoader fetches them."""
+    texts, failures = {}, {}
+    with httpx.Client(timeout=timeout) as client:
+        for url in urls:
+            try:
+                response = client.get(url)
+                response.raise_for_status()
+                texts[url] = html_to_text(response.text)
+            except Exception as e:
+                failures[url] = str(e)
+    return texts, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.2, help="Server response delay per article (seconds)")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Per-article download timeout (seconds)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_server(args.delay, stall=args.timeout * 3)
+    host, port = server.server_address
+    # Two host names for the same server exercise the per-host limits
+    urls = [f"http://{'127.0.0.1' if n % 2 else 'localhost'}:{port}/article/{n}" for n in range(1, args.articles + 1)]
+    urls.append(f"http://{host}:{port}{SLOW_PATH}")
+
+    # Start the parser pool outside the timed run
+    ingest([f"http://{host}:{port}/article/1"], timeout=args.timeout)
+
+    start = time.perf_counter()
+    documents, failures, _ = ingest(urls, concurrency=args.concurrency, per_host=args.per_host, timeout=args.timeout)
+    concurrent_seconds = time.perf_counter() - start
+    print(f"ingest:     {concurrent_seconds:8.2f}s  {len(documents)} ok, {len(failures)} failed")
+
+    # Time a sample of articles one by one, plus the stalled page, and project to the full list
+    sample = urls[:min(args.articles, 20)]
+    start = time.perf_counter()
+    texts, sequential_failures = fetch_sequential(sample, args.timeout)
+    sample_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    sequential_failures.update(fetch_sequential(urls[-1:], args.timeout)[1])
+    stall_seconds = time.perf_counter() - start
+    projected = sample_seconds / len(sample) * args.articles + stall_seconds
+    print(f"sequential: {sample_seconds + stall_seconds:8.2f}s for {len(sample) + 1} URLs (~{projected:.1f}s projected for {len(urls)})")
+
+    by_url = {doc.metadata["source"]: doc.page_content for doc in documents}
+    assert all(by_url[url] == text for url, text in texts.items()), "parsed text differs from sequential fetch"
+    assert set(failures) == set(sequential_failures) == {urls[-1]}, "only the stalled page should fail"
+    print(f"speedup:    {projected / concurrent_seconds:8.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark streamed answers against a local stand-in Ollama server.
+
+Serves Ollama's /api/generate with a fixed per-token delay, builds the bot's
+RetrievalQAWithSourcesChain over a small FAISS index with fake embeddings, and
+answers questions with answer_stream.StreamingAnswer. Reports time to first
+answer token, tokens/sec and total time, which is how long the chat showed
+nothing before answers were streamed. No model or network access is needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_streaming [--tokens 120] [--delay 0.02] [--questions 3]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain.chains import RetrievalQAWithSourcesChain
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_ollama import OllamaLLM
+
+from answer_stream import StreamingAnswer, visible_text, tag_answer_step
+
+ARTICLES = {
+    f"https://example.com/article/{n}": f"Company {n} reported revenue growth of {n * 3}% and raised its dividend."
+    for n in range(1, 9)
+}
+
+
+def make_handler(tokens, delay, extract_tokens):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            # The map step extracts passages; the combine step writes the answer and its sources
+            final = "SOURCES" in request["prompt"] and "FINAL ANSWER" in request["prompt"]
+            words = ([f"word{i} " for i in range(tokens)] + ["\nSOURCES: https://example.com/article/1"]
+                     if final else [f"extract{i} " for i in range(extract_tokens)])
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for word in words:
+                time.sleep(delay)
+                self.wfile.write(json.dumps({"model": request["model"], "response": word, "done": False}).encode() + b"\n")
+                self.wfile.flush()
+            self.wfile.write(json.dumps({"model": request["model"], "response": "", "done": True,
+                                         "done_reason": "stop", "eval_count": len(words)}).encode() + b"\n")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=120, help="Answer tokens per question")
+    parser.add_argument("--extract-tokens", type=int, default=10, help="Tokens per map-step extract")
+    parser.add_argument("--delay", type=float, default=0.02, help="Server delay per token (seconds)")
+    parser.add_argument("--questions", type=int, default=3)
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", 0), make_handler(args.tokens, args.delay, args.extract_tokens))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    vectorstore = FAISS.from_texts(list(ARTICLES.values()), DeterministicFakeEmbedding(size=64),
+                                   metadatas=[{"source": url} for url in ARTICLES])
+    # Word counts stand in for the GPT-2 tokenizer the chain would otherwise download to size its prompts
+    llm = OllamaLLM(model="stand-in", base_url=f"http://{host}:{port}", num_predict=128,
+                    custom_get_token_ids=lambda text: text.split())
+    chain = tag_answer_step(RetrievalQAWithSourcesChain.from_llm(llm=llm, retriever=vectorstore.as_retriever()))
+
+    print(f"{'question':<10} {'first token s':>14} {'tokens':>7} {'tokens/s':>9} {'total s':>8}  answer")
+    for n in range(args.questions):
+        answer = StreamingAnswer(chain, f"How did company {n + 1} do?")
+        updates = sum(1 for _ in answer)
+        stats = answer.stats()
+        assert updates == stats["tokens"] and visible_text(answer.text) == answer.result["answer"].strip()
+        assert answer.result["sources"] == "https://example.com/article/1"
+        print(f"{n + 1:<10} {stats['ttft_s']:>14.3f} {stats['tokens']:>7} {stats['tokens_per_s']:>9.1f} "
+              f"{stats['total_s']:>8.3f}  {answer.result['answer'][:30]}...")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
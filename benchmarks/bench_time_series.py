@@ -0,0 +1,66 @@
+"""
+Benchmark synthetic time-series generation for load tests and demos.
+
+Compares calling the previous generate_time_series (a list comprehension with
+one np.random.randn() per day) once per series with one utils.generate_series
+call for the whole batch, in float64 and float32, and checks that the
+single-series wrapper returns row 0 of a batch with the same seed.
+
+Run from the repository root:
+    python -m benchmarks.bench_time_series [--series 5000] [--days 365]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import generate_series, generate_time_series, TREND, NOISE, RANDOM_WALK
+
+
+def legacy_time_series(start_date, end_date, base, trend_factor, noise=0.05):
+    """generate_time_series as it was before the batch generator."""
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    values = [base + (i * trend_factor) + (i**2 * 0.1) + np.random.randn()*noise*base for i in range(len(dates))]
+    return pd.DataFrame({'Date': dates, 'Value': values})
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start_date = pd.Timestamp("2024-01-01")
+    end_date = start_date + pd.Timedelta(days=args.days - 1)
+    rng = np.random.default_rng(args.seed)
+    bases = rng.uniform(50, 5000, size=args.series)
+    trends = rng.normal(0, bases * 0.002)
+
+    _, legacy_seconds = timed(lambda: [legacy_time_series(start_date, end_date, b, t) for b, t in zip(bases, trends)])
+    print(f"{args.series} series x {args.days} days")
+    print(f"{'generator':<28} {'seconds':>9} {'speedup':>8} {'MiB':>7}")
+    print(f"{'legacy, one call per series':<28} {legacy_seconds:>9.3f} {1.0:>8.1f} {'':>7}")
+    for model in (TREND, NOISE, RANDOM_WALK):
+        for dtype in (np.float64, np.float32):
+            values, seconds = timed(lambda: generate_series(args.series, args.days, bases, trends, model=model,
+                                                            seed=args.seed, dtype=dtype))
+            assert values.shape == (args.series, args.days) and values.dtype == dtype
+            name = f"{model}, {np.dtype(dtype).name}"
+            print(f"{name:<28} {seconds:>9.3f} {legacy_seconds / seconds:>8.1f} {values.nbytes / 2 ** 20:>7.1f}")
+
+    batch = generate_series(args.series, args.days, bases, trends, seed=args.seed)
+    single = generate_time_series(start_date, end_date, bases[0], trends[0], seed=args.seed)
+    assert np.array_equal(single["Value"].to_numpy(), batch[0]), "wrapper differs from the batch generator"
+    print("\ngenerate_time_series matches row 0 of a batch with the same seed")
+
+
+if __name__ == "__main__":
+    main()
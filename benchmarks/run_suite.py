@@ -0,0 +1,241 @@
+"""
+Benchmark suite for the clustering and prediction pipelines.
+
+Generates synthetic workbooks at several scales and times load_data (cold and
+cached), stocks.process_index, crypto.retrain_model and
+crypto.evaluate_predictions, recording wall time, peak traced memory and peak
+resident memory. Each case runs twice: once untraced for wall time and peak
+RSS, and once under tracemalloc for peak traced memory. Results are written
+to JSON and can be compared against a baseline run.
+
+Run from the repository root:
+    python -m benchmarks.run_suite --output bench.json
+    python -m benchmarks.run_suite --scales small --baseline bench.json --max-slowdown 1.25
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # Peak RSS is reported as null
+    psutil = None
+
+from benchmarks.synthetic import make_stock_workbook, make_memecoin_workbook
+
+# (assets, days) per named scale
+SCALES = {
+    "small": (20, 60),
+    "medium": (100, 180),
+    "large": (400, 365),
+}
+
+
+class RssSampler:
+    """Track the peak resident set size of this process on a background thread."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.process = psutil.Process() if psutil is not None else None
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.process is not None:
+            self.peak = self.process.memory_info().rss
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+def measure(func, *args, setup=None, **kwargs):
+    """
+    Run func twice and return (result, wall seconds, peak traced MiB, peak RSS MiB).
+    Wall time and peak RSS come from a first, untraced run, since tracemalloc
+    slows allocation-heavy code unevenly; traced memory, covering Python and
+    NumPy allocations, comes from a second run. setup(), if given, runs before
+    each so both start from the same state. RSS also covers native buffers
+    (Arrow, openpyxl) and is None without psutil. The result is the first run's.
+    """
+    if setup is not None:
+        setup()
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    peak_rss = rss.peak / 2 ** 20 if rss.process is not None else None
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20, peak_rss
+
+
+def seed_prediction_log(crypto, prediction_store, combined_data, store_dir, n_rows, seed=0):
+    """Append n_rows past predictions sampled from the price history, old enough to be evaluated."""
+    history = crypto.build_price_history(combined_data)
+    history = history[history['date'] <= history['date'].max() - pd.Timedelta(days=4)]
+    rng = np.random.default_rng(seed)
+    picks = history.iloc[rng.integers(0, len(history), size=n_rows)]
+    clusters = rng.integers(0, 3, size=n_rows)
+    prediction_store.append_predictions(pd.DataFrame({
+        'Coin': picks['Coin'].values,
+        'price': picks['price'].values,
+        'prediction_date': picks['date'].values,
+        'date': picks['date'].values,
+        'Cluster': clusters,
+        'Probability_Group': np.array(['90% Uptrend', '80% Uptrend', '70% Uptrend'])[clusters],
+    }), store_dir=store_dir)
+
+
+def run_scale(scale, n_assets, n_days, workdir):
+    """Benchmark every pipeline at one scale inside workdir; returns result rows."""
+    import pages.crypto as crypto
+    import excel_cache
+    import pages.stocks as stocks
+    import prediction_store
+
+    stock_path = make_stock_workbook(os.path.join(workdir, "stocks.xlsx"), n_assets, n_days)
+    coin_path = make_memecoin_workbook(os.path.join(workdir, "memecoin.xlsx"), n_assets, n_days)
+    store_dir = os.path.join(workdir, "predictions_store")
+    model_path = os.path.join(workdir, "models", "memecoin_clusters.json")
+
+    rows = []
+
+    def cold():
+        """Drop the on-disk workbook cache."""
+        shutil.rmtree(excel_cache.CACHE_DIR, ignore_errors=True)
+
+    def fresh_model():
+        """Start retraining from no model and an empty prediction store."""
+        shutil.rmtree(os.path.dirname(model_path), ignore_errors=True)
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    def record(name, func, *args, setup=None, **kwargs):
+        result, wall, peak, peak_rss = measure(func, *args, setup=setup, **kwargs)
+        rows.append({"name": name, "scale": scale, "assets": n_assets, "days": n_days,
+                     "wall_seconds": round(wall, 4), "peak_traced_mib": round(peak, 2),
+                     "peak_rss_mib": round(peak_rss, 1) if peak_rss is not None else None})
+        rss_text = f"{peak_rss:>9.1f} MiB RSS" if peak_rss is not None else ""
+        print(f"  {name:<28} {wall:>9.3f}s {peak:>9.1f} MiB traced {rss_text}")
+        return result
+
+    record("crypto.load_data[cold]", crypto.load_data, coin_path, setup=cold)
+    combined_data = record("crypto.load_data[cached]", crypto.load_data, coin_path)
+    record("stocks.process_index[cold]", stocks.process_index, stock_path, setup=cold)
+    record("stocks.process_index[cached]", stocks.process_index, stock_path)
+    record("stocks.process_index[stream]", stocks.process_index, stock_path, streaming=True)
+    record("crypto.retrain_model", crypto.retrain_model, combined_data, store_dir=store_dir, model_path=model_path,
+           setup=fresh_model)
+    seed_prediction_log(crypto, prediction_store, combined_data, store_dir, n_rows=n_assets * 50)
+    record("crypto.evaluate_predictions", crypto.evaluate_predictions,
+           n_days=3, store_dir=store_dir, updated_data=combined_data)
+    return rows
+
+
+def compare(results, baseline, max_slowdown, min_seconds):
+    """
+    Print per-benchmark wall-time ratios against a baseline and return the
+    regressions. Benchmarks faster than min_seconds in both runs are too noisy
+    to flag.
+    """
+    base = {(r["name"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<30} {'scale':<8} {'baseline':>9} {'current':>9} {'ratio':>7}")
+    for r in results:
+        b = base.get((r["name"], r["scale"]))
+        if b is None:
+            continue
+        ratio = r["wall_seconds"] / b["wall_seconds"] if b["wall_seconds"] else float("inf")
+        noisy = max(r["wall_seconds"], b["wall_seconds"]) < min_seconds
+        flag = " REGRESSION" if ratio > max_slowdown and not noisy else ""
+        print(f"{r['name']:<30} {r['scale']:<8} {b['wall_seconds']:>9.3f} {r['wall_seconds']:>9.3f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", nargs="+", default=list(SCALES), help=f"Named scales: {', '.join(SCALES)}")
+    parser.add_argument("--assets", type=int, help="Custom number of assets (overrides --scales)")
+    parser.add_argument("--days", type=int, default=180, help="Days per asset for --assets")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+                        help="Wall-time ratio above which a benchmark counts as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.1,
+                        help="Ignore slowdowns of benchmarks faster than this in both runs")
+    args = parser.parse_args()
+
+    # Silence the bare-mode warning every st.* call logs outside `streamlit run`
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+
+    # Start the shared k-selection worker pool once so its startup is not billed
+    # to the first process_index measurement
+    from k_selection import select_k
+    select_k(np.random.default_rng(0).random((20, 2)), k_range=range(2, 4))
+
+    scales = {"custom": (args.assets, args.days)} if args.assets else {s: SCALES[s] for s in args.scales}
+    output = os.path.abspath(args.output)
+    repo_root = os.getcwd()
+
+    results = []
+    for scale, (n_assets, n_days) in scales.items():
+        print(f"{scale}: {n_assets} assets x {n_days} days")
+        with tempfile.TemporaryDirectory(prefix="fypy-bench-") as workdir:
+            # Caches, stores and models use relative paths: keep them out of the repo
+            os.chdir(workdir)
+            try:
+                results.extend(run_scale(scale, n_assets, n_days, workdir))
+            finally:
+                os.chdir(repo_root)
+
+    report = {
+        "created_at": pd.Timestamp.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_slowdown, args.min_seconds)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
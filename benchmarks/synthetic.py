@@ -0,0 +1,56 @@
+"""
+Synthetic market-data workbooks for benchmarks.
+
+Price paths follow utils.generate_time_series (base + linear trend + quadratic
+drift + proportional Gaussian noise), drawn for many assets at once from a
+seeded Generator so every run builds identical workbooks.
+"""
+import numpy as np
+import pandas as pd
+
+
+def price_paths(n_assets, n_days, seed=0, noise=0.05):
+    """Return an (n_assets, n_days) array of generate_time_series-style paths."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(50, 5000, size=(n_assets, 1))
+    trend = rng.normal(0, base * 0.002, size=(n_assets, 1))
+    i = np.arange(n_days)
+    values = base + i * trend + i ** 2 * 0.1 * np.sign(trend) + rng.standard_normal((n_assets, n_days)) * noise * base
+    return np.maximum(values, base * 0.01)
+
+
+def make_stock_workbook(path, n_assets, n_days, seed=0):
+    """Write an index workbook: one sheet per stock with Date/Close/Volume columns."""
+    rng = np.random.default_rng(seed + 1)
+    closes = price_paths(n_assets, n_days, seed=seed)
+    dates = pd.date_range("2024-01-01", periods=n_days, freq="D")
+    with pd.ExcelWriter(path) as writer:
+        for a in range(n_assets):
+            pd.DataFrame({
+                "Date": dates,
+                "Close": closes[a],
+                "Volume": rng.integers(100_000, 10_000_000, size=n_days),
+            }).to_excel(writer, sheet_name=f"STK{a}", index=False)
+    return path
+
+
+def make_memecoin_workbook(path, n_assets, n_days, seed=0):
+    """Write a memecoin workbook: one sheet per coin with date/price/market_cap/volume columns."""
+    rng = np.random.default_rng(seed + 1)
+    prices = price_paths(n_assets, n_days, seed=seed) * 1e-4
+    supply = 10 ** rng.uniform(9, 12, size=(n_assets, 1))
+    market_caps = prices * supply
+    volumes = market_caps * rng.uniform(0.001, 0.2, size=(n_assets, n_days))
+    dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=n_days, freq="D")
+    platforms = rng.choice(["solana", "ethereum", "base"], size=n_assets)
+    with pd.ExcelWriter(path) as writer:
+        for a in range(n_assets):
+            pd.DataFrame({
+                "date": dates,
+                "price": prices[a],
+                "market_cap": market_caps[a],
+                "volume": volumes[a],
+                "token": f"COIN{a}",
+                "platform": platforms[a],
+            }).to_excel(writer, sheet_name=f"coin{a}", index=False)
+    return path
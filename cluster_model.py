@@ -0,0 +1,216 @@
+import os
+import json
+import uuid
+import numpy as np
+import pandas as pd
+from filelock import FileLock
+from sklearn.cluster import KMeans
+
+# Default location of the persisted memecoin clustering model
+MODEL_PATH = os.path.join("models", "memecoin_clusters.json")
+
+# Probability groups assigned to clusters, best average price_change first
+GROUP_LABELS = ['90% Uptrend', '80% Uptrend', '70% Uptrend']
+
+# Column naming each coin, used to replace a coin's earlier rows on update
+KEY_COLUMN = 'Coin'
+
+# ============
+# NORMALIZER
+# ============
+
+def _std(model):
+    """Sample standard deviation (ddof=1) from the running stats; constant columns scale by 1."""
+    n = model['n']
+    std = np.sqrt(np.asarray(model['m2']) / (n - 1)) if n > 1 else np.ones(len(model['columns']))
+    return np.where(std > 0, std, 1.0)
+
+def _normalize(model, X):
+    return (X - np.asarray(model['mean'])) / _std(model)
+
+def _merge_stats(model, X):
+    """Fold a batch into the running mean/M2 (Chan et al. parallel update)."""
+    n_a, n_b = model['n'], len(X)
+    mean_a, m2_a = np.asarray(model['mean']), np.asarray(model['m2'])
+    mean_b = X.mean(axis=0)
+    m2_b = ((X - mean_b) ** 2).sum(axis=0)
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    model['n'] = n
+    model['mean'] = (mean_a + delta * n_b / n).tolist()
+    model['m2'] = (m2_a + m2_b + delta ** 2 * n_a * n_b / n).tolist()
+
+def _remove_stats(model, X):
+    """Take a batch folded in earlier back out of the running mean/M2 (the inverse of _merge_stats)."""
+    n, n_b = model['n'], len(X)
+    n_a = n - n_b
+    if n_a <= 0:
+        model['n'] = 0
+        model['mean'] = np.zeros(len(model['columns'])).tolist()
+        model['m2'] = np.zeros(len(model['columns'])).tolist()
+        return
+    mean, m2 = np.asarray(model['mean']), np.asarray(model['m2'])
+    mean_b = X.mean(axis=0)
+    m2_b = ((X - mean_b) ** 2).sum(axis=0)
+    mean_a = (mean * n - mean_b * n_b) / n_a
+    delta = mean_b - mean_a
+    model['n'] = n_a
+    model['mean'] = mean_a.tolist()
+    model['m2'] = np.maximum(m2 - m2_b - delta ** 2 * n_a * n_b / n, 0).tolist()
+
+# ============
+# FITTING
+# ============
+
+def _coins(features_df):
+    """Each row's coin, or None for every row without a KEY_COLUMN."""
+    if KEY_COLUMN not in features_df.columns:
+        return [None] * len(features_df)
+    return features_df[KEY_COLUMN].astype(str).tolist()
+
+def _members(coins, labels, X):
+    """{coin: [cluster, feature values]} for the rows that name a coin."""
+    return {coin: [int(label), x.tolist()] for coin, label, x in zip(coins, labels, X) if coin is not None}
+
+def unseen(model, features_df):
+    """Rows of features_df for coins that are new, or whose features changed, since the model last saw them."""
+    members = model.get('members', {})
+    X = features_df[model['columns']].to_numpy(dtype=float)
+    changed = [coin is None or coin not in members or not np.array_equal(members[coin][1], x, equal_nan=True)
+               for coin, x in zip(_coins(features_df), X)]
+    return features_df[np.array(changed, dtype=bool)]
+
+def _group_mapping(centroids, columns):
+    """Map cluster ids to probability groups by the centroids' price_change, highest first."""
+    order = np.argsort(-centroids[:, columns.index('price_change')], kind='stable')
+    mapping = {}
+    if len(order) >= len(GROUP_LABELS):
+        mapping = {str(cluster): GROUP_LABELS[rank] for rank, cluster in enumerate(order[:len(GROUP_LABELS)])}
+    return mapping
+
+def fit_model(features_df, columns, n_clusters=3, init_model=None, random_state=42):
+    """
+    Fit the clustering model on features_df[columns].
+    Without init_model this is a fresh K-Means fit; with init_model it is
+    warm-started from its centroids (a single K-Means run), so cluster ids stay
+    put. Either way the cluster -> Probability_Group mapping is derived from the
+    fitted centroids, as a refit can reorder them by price_change. Centroids are
+    stored in raw feature space alongside the normalizer stats, and each coin's
+    feature values and cluster are recorded so partial_fit can replace them.
+    """
+    X = features_df[columns].to_numpy(dtype=float)
+    model = {
+        'columns': list(columns),
+        'n': 0,
+        'mean': np.zeros(len(columns)).tolist(),
+        'm2': np.zeros(len(columns)).tolist(),
+    }
+    _merge_stats(model, X)
+    X_norm = _normalize(model, X)
+
+    if init_model is None:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=random_state)
+    else:
+        init = _normalize(model, np.asarray(init_model['centroids']))
+        kmeans = KMeans(n_clusters=len(init), init=init, n_init=1, random_state=random_state)
+    kmeans.fit(X_norm)
+
+    centroids = kmeans.cluster_centers_ * _std(model) + np.asarray(model['mean'])
+    model['centroids'] = centroids.tolist()
+    model['counts'] = np.bincount(kmeans.labels_, minlength=len(centroids)).tolist()
+    model['mapping'] = _group_mapping(centroids, model['columns'])
+    model['members'] = _members(_coins(features_df), kmeans.labels_, X)
+    model['updated_at'] = pd.Timestamp.now().isoformat()
+    return model
+
+def partial_fit(model, features_df):
+    """
+    MiniBatchKMeans-style update with a batch of new or changed coins (see
+    unseen). A changed coin's previous values are first taken back out of the
+    normalizer stats and of the centroid it was assigned to; then the batch is
+    folded into the stats, assigned to the nearest centroids, and each centroid
+    moves towards its members with a per-centroid 1/count learning rate. Only
+    new coins raise the counts. Cost is linear in the batch size; cluster ids
+    and mapping are kept, and an empty batch leaves the model as it is.
+    """
+    if features_df.empty:
+        return model
+    X = features_df[model['columns']].to_numpy(dtype=float)
+    coins = _coins(features_df)
+    members = model.setdefault('members', {})
+    centroids = np.asarray(model['centroids'])
+    counts = np.asarray(model['counts'], dtype=float)
+
+    previous = [members[coin] for coin in coins if coin in members]
+    if previous:
+        old_labels = np.array([label for label, _ in previous])
+        old_X = np.array([values for _, values in previous], dtype=float)
+        _remove_stats(model, old_X)
+        for cluster in np.unique(old_labels):
+            leaving = old_X[old_labels == cluster]
+            remaining = counts[cluster] - len(leaving)
+            if remaining > 0:
+                centroids[cluster] = (centroids[cluster] * counts[cluster] - leaving.sum(axis=0)) / remaining
+            counts[cluster] = max(remaining, 0)
+        model['centroids'] = centroids.tolist()
+
+    _merge_stats(model, X)
+    labels = _nearest(model, X)
+    for cluster in np.unique(labels):
+        joining = X[labels == cluster]
+        counts[cluster] += len(joining)
+        centroids[cluster] += (joining.sum(axis=0) - len(joining) * centroids[cluster]) / counts[cluster]
+
+    model['centroids'] = centroids.tolist()
+    model['counts'] = counts.astype(int).tolist()
+    members.update(_members(coins, labels, X))
+    model['updated_at'] = pd.Timestamp.now().isoformat()
+    return model
+
+# ============
+# PREDICTION
+# ============
+
+def _nearest(model, X):
+    X_norm = _normalize(model, X)
+    centroids_norm = _normalize(model, np.asarray(model['centroids']))
+    distances = ((X_norm[:, None, :] - centroids_norm[None, :, :]) ** 2).sum(axis=2)
+    return distances.argmin(axis=1)
+
+def predict_clusters(model, features_df):
+    """
+    Assign coins to the model's clusters without refitting.
+    Returns (Cluster labels, Probability_Group Series) aligned with features_df.
+    """
+    labels = _nearest(model, features_df[model['columns']].to_numpy(dtype=float))
+    groups = pd.Series(labels, index=features_df.index).astype(str).map(model['mapping'])
+    return labels, groups
+
+# ============
+# PERSISTENCE
+# ============
+
+def load_model(path=MODEL_PATH):
+    """Return the persisted model, or None if none has been saved yet."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def model_lock(path=MODEL_PATH):
+    """File lock to hold around a load_model -> update -> save_model cycle."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return FileLock(f"{path}.lock")
+
+def save_model(model, path=MODEL_PATH):
+    """Persist the model as JSON, replacing any previous version atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(model, f, indent=1)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+# Downsampling methods
+MINMAX = "minmax"  # first, last and the min and max of each bucket
+LTTB = "lttb"      # Largest-Triangle-Three-Buckets on min-max preselected points
+METHODS = (MINMAX, LTTB)
+
+# Points drawn per horizontal pixel of a chart
+POINTS_PER_PIXEL = 2
+
+# Chart width assumed when choosing a resolution, in pixels (plotly.js default)
+DEFAULT_WIDTH = 700
+
+# Min-max points kept per output point before LTTB, so LTTB never scans a whole long series
+LTTB_PRESELECT = 4
+
+def _numeric(x):
+    """x as a float64 array, datetimes as nanoseconds since the epoch."""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        x = x.astype("datetime64[ns]").view(np.int64)
+    return x.astype(np.float64)
+
+def _position(value, like):
+    """value on the scale of _numeric(like)."""
+    if np.asarray(like).dtype.kind == "M":
+        return float(pd.Timestamp(value).as_unit("ns").value)
+    return float(value)
+
+def points_for(width=DEFAULT_WIDTH, points_per_pixel=POINTS_PER_PIXEL):
+    """Points worth drawing in a chart width pixels wide."""
+    return max(4, int(width * points_per_pixel))
+
+def visible(x, x_range=None, pad=1):
+    """
+    (first, stop) positions of the points of sorted x inside x_range, a
+    (low, high) pair of x values, plus pad points either side so a line
+    reaches the edges of the chart. None, or None for either end, means open.
+    """
+    if x_range is None:
+        return 0, len(x)
+    low, high = x_range
+    positions = _numeric(x)
+    first = 0 if low is None else max(int(np.searchsorted(positions, _position(low, x), "left")) - pad, 0)
+    stop = len(x) if high is None else min(int(np.searchsorted(positions, _position(high, x), "right")) + pad, len(x))
+    return first, stop
+
+def minmax_indices(y, n_out):
+    """
+    Sorted indices of about n_out points of y: the first, the last, and the
+    minimum and maximum of each of (n_out - 2) // 2 equal buckets in between,
+    so every local extreme at bucket scale, and the global ones, are kept.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    buckets = max(1, (n_out - 2) // 2)
+    interior = y[1:n - 1]
+    size = -(-len(interior) // buckets)
+    pad = size * buckets - len(interior)
+    lows = np.concatenate([interior, np.full(pad, np.inf)]).reshape(buckets, size).argmin(axis=1)
+    highs = np.concatenate([interior, np.full(pad, -np.inf)]).reshape(buckets, size).argmax(axis=1)
+    offsets = np.arange(buckets) * size + 1
+    picked = np.concatenate([offsets + lows, offsets + highs])
+    # Buckets made only of padding pick positions past the interior
+    picked = picked[picked < n - 1]
+    return np.unique(np.concatenate([[0], picked, [n - 1]]))
+
+def lttb_indices(x, y, n_out):
+    """
+    Sorted indices of n_out points of (x, y) chosen by Largest-Triangle-Three-
+    Buckets: the first, the last, and from each bucket in between the point
+    making the largest triangle with the point kept before it and the mean of
+    the next bucket.
+    """
+    x = _numeric(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+    x = x - x[0]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        low, high = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[high:edges[i + 2]].mean(), y[high:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - next_x) * (y[low:high] - y[a]) - (x[a] - x[low:high]) * (next_y - y[a]))
+        a = low + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+def downsample(x, y, x_range=None, width=DEFAULT_WIDTH, method=MINMAX):
+    """
+    Indices into (x, y), sorted by x, of the points to draw for the part of the
+    series inside x_range in a chart width pixels wide. The first, last,
+    minimum and maximum visible points are always kept; a series with no more
+    points than the chart can show is returned whole.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    first, stop = visible(x, x_range)
+    x = np.asarray(x)[first:stop]
+    y = np.asarray(y, dtype=np.float64)[first:stop]
+    n_out = points_for(width)
+    if len(y) <= n_out:
+        return np.arange(first, stop)
+    if method == MINMAX:
+        kept = minmax_indices(y, n_out)
+    else:
+        kept = minmax_indices(y, n_out * LTTB_PRESELECT)
+        kept = kept[lttb_indices(x[kept], y[kept], n_out)]
+        kept = np.union1d(kept, [y.argmin(), y.argmax()])
+    return first + kept
@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Inference precisions
+FLOAT32 = "float32"
+BFLOAT16 = "bfloat16"  # autocast matmuls to bfloat16; fastest on CPUs with AVX512-BF16/AMX
+INT8 = "int8"          # dynamic int8 quantization of the Linear layers
+PRECISIONS = (FLOAT32, BFLOAT16, INT8)
+
+# Defaults: HuggingFaceEmbeddings' batch size, and a padded-token budget per batch
+BATCH_SIZE = 32
+MAX_BATCH_TOKENS = 8192
+
+def config_from_env():
+    """Embedding settings from FYPY_EMBED_* environment variables, as keyword arguments for TunedEmbeddings."""
+    threads = os.getenv("FYPY_EMBED_THREADS")
+    return {
+        "batch_size": int(os.getenv("FYPY_EMBED_BATCH_SIZE", BATCH_SIZE)),
+        "max_batch_tokens": int(os.getenv("FYPY_EMBED_MAX_BATCH_TOKENS", MAX_BATCH_TOKENS)),
+        "sort_by_length": os.getenv("FYPY_EMBED_SORT_BY_LENGTH", "1") != "0",
+        "threads": int(threads) if threads else None,
+        "precision": os.getenv("FYPY_EMBED_PRECISION", FLOAT32),
+    }
+
+class TunedEmbeddings(Embeddings):
+    """
+    sentence-transformers embeddings with explicit throughput settings.
+
+    Texts are tokenized once, sorted by token count and cut into dynamic batches
+    of at most batch_size texts and max_batch_tokens padded tokens, so short
+    chunks travel in large batches and long ones do not pad everything else.
+    threads sets torch's intra-op thread count (a process-wide setting) while
+    encoding. precision selects float32, bfloat16 autocast or dynamic int8
+    quantization; vectors are always returned as float32.
+
+    chunks and seconds accumulate over embed_documents calls; chunks_per_second
+    is the resulting throughput.
+    """
+
+    def __init__(self, model_name, batch_size=BATCH_SIZE, max_batch_tokens=MAX_BATCH_TOKENS,
+                 sort_by_length=True, threads=None, precision=FLOAT32, device="cpu", model=None):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        import torch
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.sort_by_length = sort_by_length
+        self.threads = threads
+        self.precision = precision
+        self.model = model if model is not None else SentenceTransformer(model_name, device=device)
+        self.model.eval()
+        if precision == INT8:
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.chunks = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def chunks_per_second(self):
+        return self.chunks / self.seconds if self.seconds else None
+
+    def _token_counts(self, texts):
+        tokenizer = self.model.tokenizer
+        encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=self.model.max_seq_length)
+        return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+    def batches(self, texts):
+        """Lists of text positions, one per batch, in the order they are encoded."""
+        if not self.sort_by_length:
+            return [list(range(start, min(start + self.batch_size, len(texts))))
+                    for start in range(0, len(texts), self.batch_size)]
+        counts = self._token_counts(texts)
+        batches, batch = [], []
+        for position in np.argsort(-counts, kind="stable"):
+            # Sorted longest first, so the batch's padded length is its first text's
+            padded = counts[batch[0]] if batch else counts[position]
+            if batch and (len(batch) >= self.batch_size or (len(batch) + 1) * padded > self.max_batch_tokens):
+                batches.append(batch)
+                batch = []
+            batch.append(int(position))
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _encode(self, texts):
+        import torch
+        vectors = None
+        autocast = torch.autocast("cpu", dtype=torch.bfloat16, enabled=self.precision == BFLOAT16)
+        previous_threads = torch.get_num_threads()
+        with self._lock:
+            if self.threads:
+                torch.set_num_threads(self.threads)
+            try:
+                with torch.inference_mode(), autocast:
+                    for batch in self.batches(texts):
+                        encoded = self.model.encode([texts[i] for i in batch], batch_size=len(batch),
+                                                    convert_to_tensor=True, show_progress_bar=False)
+                        if vectors is None:
+                            vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+                        vectors[batch] = encoded.float().cpu().numpy()
+            finally:
+                if self.threads:
+                    torch.set_num_threads(previous_threads)
+        return vectors
+
+    def embed_documents(self, texts):
+        texts = [text.replace("\n", " ") for text in texts]
+        if not texts:
+            return []
+        start = time.perf_counter()
+        vectors = self._encode(texts)
+        self.seconds += time.perf_counter() - start
+        self.chunks += len(texts)
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self._encode([text.replace("\n", " ")])[0].tolist()
+
+    def stats(self):
+        return {
+            'model': self.model_name,
+            'precision': self.precision,
+            'batch_size': self.batch_size,
+            'threads': self.threads,
+            'chunks': self.chunks,
+            'chunks_per_second': round(self.chunks_per_second, 1) if self.chunks_per_second else None,
+        }
@@ -0,0 +1,241 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Directory holding one cache per embedding model
+CACHE_DIR = os.path.join(".cache", "embeddings")
+
+# Default size bound of each model's vector file
+MAX_BYTES = 512 * 2 ** 20
+
+# Query embeddings remembered in memory by CachedEmbeddings
+RECENT_QUERIES = 64
+
+# Largest number of SQL parameters bound in one statement
+_BATCH = 500
+
+def _text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Disk-backed cache of embedding vectors for one model, keyed by the SHA-256 of
+    the embedded text.
+
+    Vectors live in a memory-mapped float32 matrix (vectors.f32), one row per
+    slot; an SQLite index (index.db) maps each key to its slot and last-use time.
+    Once the matrix would exceed max_bytes, the least recently used entries are
+    evicted and their slots reused, so the file never grows past the bound.
+    Several processes can share a cache: slot allocation and writes, and reads
+    of a slot's row, happen inside an SQLite write transaction.
+    """
+
+    def __init__(self, model_name, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(cache_dir, hashlib.sha1(model_name.encode("utf-8")).hexdigest()[:16])
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        self._matrix = None
+        self._dim = None
+        self._lock = threading.Lock()
+
+    # ============
+    # STORAGE
+    # ============
+
+    @property
+    def _data_path(self):
+        return os.path.join(self.directory, "vectors.f32")
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(self.directory, exist_ok=True)
+            db = sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=30,
+                                 isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            db.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            db.execute("INSERT OR IGNORE INTO meta VALUES ('model_name', ?)", (self.model_name,))
+            self._db = db
+            dim = self._meta("dim")
+            self._dim = int(dim) if dim is not None else None
+        return self._db
+
+    def _meta(self, name):
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _rows(self, min_rows=0):
+        """The vector matrix, remapped if another writer has grown the file past what is mapped."""
+        if self._matrix is None or len(self._matrix) < min_rows:
+            rows = os.path.getsize(self._data_path) // (4 * self._dim) if os.path.exists(self._data_path) else 0
+            self._matrix = np.memmap(self._data_path, dtype=np.float32, mode="r+", shape=(rows, self._dim)) if rows else None
+        return self._matrix
+
+    def _grow(self, rows):
+        """Extend the vector file to at least `rows` rows, doubling to amortize growth."""
+        current = os.path.getsize(self._data_path) // (4 * self._dim) if os.path.exists(self._data_path) else 0
+        if current >= rows:
+            return
+        new_rows = min(max(rows, current * 2, 1024), self.capacity)
+        with open(self._data_path, "ab") as f:
+            f.truncate(new_rows * 4 * self._dim)
+        self._matrix = None
+
+    @property
+    def capacity(self):
+        """Number of vectors that fit in max_bytes (None until the dimension is known)."""
+        return max(self.max_bytes // (4 * self._dim), 1) if self._dim else None
+
+    # ============
+    # LOOKUP / STORE
+    # ============
+
+    def get_many(self, texts):
+        """
+        Return a list with the cached float32 vector for each text, or None where
+        it is not cached. Slots are looked up and their rows read inside one
+        write transaction, as is every put_many, so another process cannot evict
+        and reuse a slot in between.
+        """
+        keys = [_text_key(text) for text in texts]
+        found = {}
+        with self._lock:
+            db = self._connect()
+            if self._dim is not None:
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    unique = list(dict.fromkeys(keys))
+                    for i in range(0, len(unique), _BATCH):
+                        batch = unique[i:i + _BATCH]
+                        marks = ",".join("?" * len(batch))
+                        found.update(db.execute(f"SELECT key, slot FROM entries WHERE key IN ({marks})", batch).fetchall())
+                        db.execute(f"UPDATE entries SET last_used = ? WHERE key IN ({marks})", [time.time(), *batch])
+                    if found:
+                        matrix = self._rows(max(found.values()) + 1)
+                        found = {key: np.array(matrix[slot]) for key, slot in found.items()}
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+        vectors = [found.get(key) for key in keys]
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, texts, vectors):
+        """Store vectors for texts, evicting least recently used entries to stay within max_bytes."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        entries = dict(zip((_text_key(text) for text in texts), vectors))
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._dim is None:
+                    dim = self._meta("dim")  # Another process may have set it
+                    self._dim = int(dim) if dim is not None else vectors.shape[1]
+                    db.execute("INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (str(self._dim),))
+                if vectors.shape[1] != self._dim:
+                    raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the cache ({self._dim}).")
+
+                keys = list(entries)
+                for i in range(0, len(keys), _BATCH):
+                    batch = keys[i:i + _BATCH]
+                    present = db.execute(f"SELECT key FROM entries WHERE key IN ({','.join('?' * len(batch))})", batch)
+                    for (key,) in present.fetchall():
+                        del entries[key]
+                # Keep only the newest vectors that can fit at all
+                new_keys = list(entries)[-self.capacity:]
+
+                count = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                overflow = count + len(new_keys) - self.capacity
+                if overflow > 0:
+                    evicted = db.execute("SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (overflow,)).fetchall()
+                    db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+                    db.executemany("INSERT INTO free_slots VALUES (?)", [(slot,) for _, slot in evicted])
+                    self.evictions += len(evicted)
+
+                free = [slot for (slot,) in db.execute("SELECT slot FROM free_slots ORDER BY slot LIMIT ?", (len(new_keys),))]
+                if free:
+                    db.execute(f"DELETE FROM free_slots WHERE slot IN ({','.join('?' * len(free))})", free)
+                next_slot = int(self._meta("next_slot") or 0)
+                slots = free + list(range(next_slot, next_slot + len(new_keys) - len(free)))
+                next_slot = max(next_slot, max(slots) + 1) if slots else next_slot
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('next_slot', ?)", (str(next_slot),))
+
+                if slots:
+                    self._grow(next_slot)
+                    matrix = self._rows(next_slot)
+                    for key, slot in zip(new_keys, slots):
+                        matrix[slot] = entries[key]
+                    matrix.flush()
+                now = time.time()
+                db.executemany("INSERT INTO entries VALUES (?, ?, ?)", [(key, slot, now) for key, slot in zip(new_keys, slots)])
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        """Entry count, bytes on disk and this process's hit/miss/eviction counters."""
+        with self._lock:
+            db = self._connect()
+            entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'model': self.model_name,
+            'entries': entries,
+            'bytes': os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+        }
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves documents from an EmbeddingCache and embeds
+    only the texts it has never seen. Queries are not written to the cache, but
+    the last RECENT_QUERIES are remembered, so a question embedded for the answer
+    cache is not embedded again by the retriever.
+    """
+
+    def __init__(self, embeddings, cache):
+        self.embeddings = embeddings
+        self.cache = cache
+        self._recent_queries = OrderedDict()
+        self._query_lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        vectors = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            computed = dict(zip(missing, np.asarray(self.embeddings.embed_documents(missing), dtype=np.float32)))
+            self.cache.put_many(missing, list(computed.values()))
+            vectors = [computed[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text):
+        with self._query_lock:
+            if text in self._recent_queries:
+                self._recent_queries.move_to_end(text)
+                return self._recent_queries[text]
+        vector = self.embeddings.embed_query(text)
+        with self._query_lock:
+            self._recent_queries[text] = vector
+            if len(self._recent_queries) > RECENT_QUERIES:
+                self._recent_queries.popitem(last=False)
+        return vector
@@ -0,0 +1,200 @@
+import os
+import json
+import uuid
+import hashlib
+import numpy as np
+import pandas as pd
+import openpyxl
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Fall back to parsing the workbook on every load
+    pa = None
+
+# Directory holding the converted workbooks and their manifests
+CACHE_DIR = os.path.join(".cache", "workbooks")
+
+# Internal columns used to rebuild the (sheet, row) MultiIndex from the flat table
+SHEET_COLUMN = "__sheet__"
+ROW_COLUMN = "__row__"
+
+def file_fingerprint(file_path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_paths(file_path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"{os.path.basename(file_path)}.{key}")
+    return base + ".arrow", base + ".json"
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_manifest(manifest_path, manifest):
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+    _write_atomic(manifest_path, write)
+
+def parse_workbook(file_path, names, on_sheet_error=None):
+    """
+    Parse every sheet of an Excel workbook and combine them into one DataFrame
+    with a MultiIndex (sheet, row). Sheets that fail to parse are skipped and
+    reported through on_sheet_error(sheet_name, exc). Returns None if no sheet loaded.
+    """
+    excel_file = pd.ExcelFile(file_path)
+    all_data = {}
+    for sheet_name in excel_file.sheet_names:
+        try:
+            all_data[sheet_name] = excel_file.parse(sheet_name)
+        except Exception as e:
+            if on_sheet_error is not None:
+                on_sheet_error(sheet_name, e)
+    if not all_data:
+        return None
+    return pd.concat(all_data.values(), keys=all_data.keys(), names=names)
+
+def _sheet_spans(combined_data):
+    """[sheet, start row, row count] for each sheet's contiguous block of rows."""
+    sheets = combined_data.index.get_level_values(0).astype(str)
+    starts = np.r_[0, np.flatnonzero(sheets[1:] != sheets[:-1]) + 1]
+    lengths = np.diff(np.r_[starts, len(sheets)])
+    return [[sheets[start], int(start), int(length)] for start, length in zip(starts, lengths)]
+
+def _to_table(combined_data):
+    flat = combined_data.copy()
+    flat.insert(0, SHEET_COLUMN, combined_data.index.get_level_values(0).astype(str))
+    flat.insert(1, ROW_COLUMN, combined_data.index.get_level_values(1))
+    return pa.Table.from_pandas(flat.reset_index(drop=True), preserve_index=False)
+
+def _from_table(table, names):
+    flat = table.to_pandas()
+    flat = flat.set_index([SHEET_COLUMN, ROW_COLUMN])
+    flat.index.names = names
+    return flat
+
+def _cached_table(file_path, cache_dir):
+    """
+    Return (memory-mapped table, manifest) if the cache entry for file_path is still
+    valid, else None. An entry is valid if mtime and size match, or if only the mtime
+    moved and the content hash is unchanged.
+    """
+    stat = os.stat(file_path)
+    data_path, manifest_path = _cache_paths(file_path, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    if manifest is None or not os.path.exists(data_path):
+        return None
+
+    fresh = manifest["mtime_ns"] == stat.st_mtime_ns and manifest["size"] == stat.st_size
+    if not fresh and manifest["size"] == stat.st_size:
+        # Only the mtime moved: trust the cache if the contents are unchanged
+        if file_fingerprint(file_path) == manifest["sha256"]:
+            manifest["mtime_ns"] = stat.st_mtime_ns
+            _write_manifest(manifest_path, manifest)
+            fresh = True
+    if not fresh:
+        return None
+    try:
+        return feather.read_table(data_path, memory_map=True), manifest
+    except (OSError, pa.ArrowException):
+        return None  # Corrupt or unreadable cache entry
+
+def load_workbook(file_path, names=("Sheet", "Index"), on_sheet_error=None, cache_dir=CACHE_DIR):
+    """
+    Load an Excel workbook as a (sheet, row) MultiIndex DataFrame, going through
+    an on-disk Arrow cache.
+
+    The first load parses the workbook and writes it as an uncompressed Arrow file;
+    later loads memory-map that file instead of re-parsing Excel. The cache entry is
+    keyed by path, mtime and content hash, so it rebuilds itself when the source
+    changes and survives a touch that leaves the contents alone.
+    """
+    names = list(names)
+    if pa is None:
+        return parse_workbook(file_path, names, on_sheet_error)
+
+    cached = _cached_table(file_path, cache_dir)
+    if cached is not None:
+        return _from_table(cached[0], names)
+
+    stat = os.stat(file_path)
+    combined_data = parse_workbook(file_path, names, on_sheet_error)
+    if combined_data is None:
+        return None
+
+    try:
+        table = _to_table(combined_data)
+    except (pa.ArrowException, TypeError, ValueError):
+        # Mixed-type columns that Arrow cannot represent: serve uncached
+        return combined_data
+
+    data_path, manifest_path = _cache_paths(file_path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_atomic(data_path, lambda path: feather.write_feather(table, path, compression="uncompressed"))
+    _write_manifest(manifest_path, {
+        "source": os.path.abspath(file_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": file_fingerprint(file_path),
+        "sheets": _sheet_spans(combined_data),
+    })
+    return combined_data
+
+# ============
+# STREAMING
+# ============
+
+def _iter_excel_sheets(file_path, on_sheet_error):
+    """Yield (sheet name, DataFrame) straight from the workbook, one sheet in memory at a time."""
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            try:
+                rows = workbook[sheet_name].iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    continue
+                sheet_data = pd.DataFrame.from_records(list(rows), columns=list(header))
+            except Exception as e:
+                if on_sheet_error is not None:
+                    on_sheet_error(sheet_name, e)
+                continue
+            yield sheet_name, sheet_data
+    finally:
+        workbook.close()
+
+def iter_sheets(file_path, on_sheet_error=None, cache_dir=CACHE_DIR):
+    """
+    Yield (sheet name, DataFrame) for each sheet of a workbook without ever
+    materializing the whole workbook. If a valid Arrow cache entry exists, sheets
+    are zero-copy slices of the memory-mapped file; otherwise the workbook is read
+    with openpyxl in read-only mode. Either way peak memory is bounded by the
+    largest sheet. Streaming never builds the cache itself.
+    """
+    cached = _cached_table(file_path, cache_dir) if pa is not None else None
+    if cached is not None and "sheets" in cached[1]:
+        table = cached[0]
+        for sheet_name, start, length in cached[1]["sheets"]:
+            sheet_data = table.slice(start, length).to_pandas().set_index(ROW_COLUMN)
+            sheet_data.index.name = None
+            yield sheet_name, sheet_data.drop(columns=SHEET_COLUMN)
+        return
+    yield from _iter_excel_sheets(file_path, on_sheet_error)
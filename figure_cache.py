@@ -0,0 +1,60 @@
+import threading
+import zlib
+import plotly.graph_objects as go
+import streamlit as st
+from cachetools import LRUCache
+
+# Base figures and their data kept, keyed by series and date range
+CACHE_SIZE = 64
+
+# Figure copies kept per session, least recently used dropped first
+SESSION_SIZE = 8
+
+_cache = LRUCache(maxsize=CACHE_SIZE)
+_lock = threading.Lock()
+_counts = {"hits": 0, "misses": 0}
+
+# Session-state key of this session's copies of the base figures
+_SESSION_KEY = "_figure_cache"
+
+def seed(key):
+    """A seed for key's synthetic data, stable across processes, unlike hash()."""
+    return zlib.crc32(repr(key).encode("utf-8"))
+
+def _cached(key, build):
+    with _lock:
+        value = _cache.get(key)
+        _counts["hits" if value is not None else "misses"] += 1
+    if value is None:
+        value = build()
+        with _lock:
+            _cache[key] = value
+    return value
+
+def data(key, build):
+    """The series or frame for key, from build() the first time and cached afterwards; shared, so not to be modified."""
+    return _cached(("data", key), build)
+
+def figure(key, build):
+    """
+    (data, figure) for key, from build() the first time and cached afterwards.
+    Both are shared by every session, so callers must not modify them; use
+    session_figure for a figure to draw overlays on.
+    """
+    return _cached(("figure", key), build)
+
+def session_figure(key, build):
+    """
+    (data, figure) for key like figure(), but the figure is this session's own
+    copy, made once and kept among its SESSION_SIZE most recent, so overlays
+    can be moved in place on each rerun instead of rebuilding the figure.
+    """
+    copies = st.session_state.setdefault(_SESSION_KEY, LRUCache(maxsize=SESSION_SIZE))
+    if key not in copies:
+        values, base = figure(key, build)
+        copies[key] = (values, go.Figure(base))
+    return copies[key]
+
+def stats():
+    with _lock:
+        return {'cached': len(_cache), **_counts}
@@ -0,0 +1,106 @@
+import math
+import time
+import pyarrow as pa
+import streamlit as st
+import sparklines
+
+# Rows sent to the browser per page
+PAGE_SIZE = 50
+
+# Column added to each page with the row's sparkline
+TREND_COLUMN = "Trend"
+
+def _color_change(value):
+    return "color: green" if value >= 0 else "color: red"
+
+def _arrow_bytes(frame):
+    """Size of frame serialized as an Arrow stream, as st.dataframe sends it."""
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+def _grid_key(key):
+    return f"{key}-grid-{st.session_state.get(f'{key}-view', 0)}"
+
+def _reset_selection(key):
+    """
+    Forget the grid's selected row, a position on the page it was made on. The
+    grid also gets a new key, or the browser would send the old selection back.
+    """
+    st.session_state.pop(_grid_key(key), None)
+    st.session_state[f"{key}-view"] = st.session_state.get(f"{key}-view", 0) + 1
+
+def _reset_page(key):
+    st.session_state[f"{key}-page"] = 1
+    _reset_selection(key)
+
+def filter_sort(df, query="", symbol_column="Name", sort_by=None, descending=False):
+    """Rows of df whose symbol contains query (case-insensitive), sorted by sort_by."""
+    if query:
+        df = df[df[symbol_column].astype(str).str.contains(query, case=False, regex=False)]
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=not descending, kind="stable")
+    return df
+
+def render_grid(df, key, symbol_column="Name", change_column=None, column_config=None,
+                page_size=PAGE_SIZE, window=sparklines.WINDOW):
+    """
+    Render the holdings in df as one paginated, sortable and filterable grid.
+
+    Filtering and sorting run on the whole DataFrame, but only the current page,
+    with a sparkline per row from the sparklines cache, is styled and sent to
+    the browser, so a rerun costs about the same for ten or ten thousand rows.
+    Changing the filter or sort goes back to the first page, and changing the
+    page, filter or sort clears the selection.
+    change_column, if given, is colored green or red by sign. column_config is
+    passed to st.dataframe. Returns the selected row as a Series, or None.
+    """
+    start = time.perf_counter()
+    controls = st.columns([3, 2, 1, 1])
+    query = controls[0].text_input("Filter", key=f"{key}-filter", placeholder=f"Search {symbol_column.lower()}",
+                                   on_change=_reset_page, args=(key,))
+    sort_by = controls[1].selectbox("Sort by", [None, *df.columns], key=f"{key}-sort",
+                                    format_func=lambda column: "Original order" if column is None else column,
+                                    on_change=_reset_page, args=(key,))
+    descending = controls[2].toggle("Descending", key=f"{key}-descending", on_change=_reset_page, args=(key,))
+    view = filter_sort(df, query, symbol_column, sort_by, descending)
+    pages = max(1, math.ceil(len(view) / page_size))
+    # The holdings themselves can shrink between reruns too
+    if st.session_state.get(f"{key}-page", 1) > pages:
+        _reset_page(key)
+    page_number = controls[3].number_input("Page", min_value=1, max_value=pages, key=f"{key}-page",
+                                           on_change=_reset_selection, args=(key,))
+
+    first = (page_number - 1) * page_size
+    page = view.iloc[first:first + page_size].copy()
+    page[TREND_COLUMN] = [sparklines.series(symbol, window) for symbol in page[symbol_column]]
+    data = page.style.map(_color_change, subset=[change_column]) if change_column else page
+    event = st.dataframe(
+        data,
+        hide_index=True,
+        key=_grid_key(key),
+        on_select="rerun",
+        selection_mode="single-row",
+        column_config={**(column_config or {}), TREND_COLUMN: st.column_config.LineChartColumn(TREND_COLUMN)},
+    )
+    st.caption(f"Rows {first + 1 if len(page) else 0}–{first + len(page)} of {len(view)}"
+               f"{f' (filtered from {len(df)})' if len(view) != len(df) else ''} · "
+               f"{_arrow_bytes(page) / 1024:.1f} KiB sent · "
+               f"rendered in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # A selection can outlive its page for a rerun; never index past this one
+    selected = event.selection.rows
+    return page.iloc[selected[0]].drop(TREND_COLUMN) if selected and selected[0] < len(page) else None
+
+def render_actions(row, key, symbol_column="Name", quantity_column="Quantity"):
+    """Trade and Convert buttons for the row selected in a grid."""
+    if row is None:
+        st.caption("Select a row to trade or convert it.")
+        return
+    trade, convert, _ = st.columns([1, 1, 4])
+    if trade.button(f"Trade {row[symbol_column]}", key=f"{key}-trade", type="primary"):
+        st.success(f"Simulated trade of {row[quantity_column]} {row[symbol_column]}.")
+    if convert.button(f"Convert {row[symbol_column]}", key=f"{key}-convert"):
+        st.success(f"Simulated conversion of {row[quantity_column]} {row[symbol_column]}.")
@@ -16,6 +16,10 @@ import pages.profile as profile
 import pages.settings as settings
 import pages.login as login
 import pages.signup as signup
+import model_registry
+
+# Optionally load models in the background at startup, e.g. FYPY_PREWARM_MODELS=embeddings,llm
+model_registry.prewarm(*filter(None, os.getenv("FYPY_PREWARM_MODELS", "").split(",")))
 
 st.set_page_config(page_title="FyPy", page_icon="💎", layout="wide")
 
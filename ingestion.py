@@ -0,0 +1,137 @@
+import time
+import asyncio
+import threading
+import multiprocessing
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import httpx
+from langchain_core.documents import Document
+
+# Downloads in flight at once, overall and per host
+MAX_CONCURRENCY = 16
+MAX_PER_HOST = 4
+
+# Seconds allowed to connect, and for the whole download of one article
+CONNECT_TIMEOUT = 5
+TIMEOUT = 20
+
+USER_AGENT = "Mozilla/5.0 (compatible; FyPy article fetcher)"
+
+def html_to_text(html):
+    """
+    Extract the readable text of an HTML page, one element per paragraph. Uses
+    unstructured like UnstructuredURLLoader does, else BeautifulSoup. Runs in a
+    worker process.
+    """
+    try:
+        from unstructured.partition.html import partition_html
+    except ImportError:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+        for tag in soup(["script", "style", "noscript", "nav", "header", "footer"]):
+            tag.decompose()
+        return "\n\n".join(line.strip() for line in soup.get_text("\n").splitlines() if line.strip())
+    return "\n\n".join(str(element) for element in partition_html(text=html))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Parser processes shared by every ingest call, created on first use and spawned rather than forked."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=multiprocessing.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def _fetch(client, url, limit, host_limits, timeout):
+    host = urlsplit(url).netloc
+    async with limit, host_limits[host]:
+        # httpx timeouts bound each network operation; this bounds the whole download
+        response = await asyncio.wait_for(client.get(url), timeout)
+        response.raise_for_status()
+        return response.text
+
+async def _parse(html, parse):
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), parse, html)
+    except BrokenProcessPool:
+        # A parser process died (or cannot be spawned here): replace the pool and parse in a thread
+        _reset_pool()
+        return await asyncio.to_thread(parse, html)
+
+async def _ingest(urls, parse, splitter, embeddings, needs_embedding, concurrency, per_host, timeout, on_progress):
+    limit = asyncio.Semaphore(concurrency)
+    host_limits = {host: asyncio.Semaphore(per_host) for host in {urlsplit(url).netloc for url in urls}}
+    documents, failures, timings = {}, {}, {}
+    done = 0
+    # One embedding thread: the model already uses every core for a batch
+    embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-embed")
+    loop = asyncio.get_running_loop()
+
+    async def process(client, url):
+        nonlocal done
+        start = time.perf_counter()
+        try:
+            html = await _fetch(client, url, limit, host_limits, timeout)
+            fetched = time.perf_counter()
+            text = await _parse(html, parse)
+            parsed = time.perf_counter()
+            document = Document(page_content=text, metadata={"source": url})
+            if splitter is not None and embeddings is not None and (needs_embedding is None or needs_embedding(document)):
+                # Embed while other articles are still downloading; with a cached
+                # embeddings object the later index update finds these vectors
+                chunks = [chunk.page_content for chunk in splitter.split_documents([document])]
+                await loop.run_in_executor(embed_executor, embeddings.embed_documents, chunks)
+            documents[url] = document
+            timings[url] = {"fetch_seconds": fetched - start, "parse_seconds": parsed - fetched,
+                            "embed_seconds": time.perf_counter() - parsed}
+        except Exception as e:
+            failures[url] = f"{type(e).__name__}: {e}"
+        done += 1
+        if on_progress is not None:
+            on_progress(done, len(urls), url, url not in failures)
+
+    client_timeout = httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(timeout=client_timeout, limits=limits, follow_redirects=True,
+                                     headers={"User-Agent": USER_AGENT}) as client:
+            await asyncio.gather(*(process(client, url) for url in urls))
+    finally:
+        embed_executor.shutdown(wait=False)
+    return documents, failures, timings
+
+def ingest(urls, splitter=None, embeddings=None, parse=html_to_text, concurrency=MAX_CONCURRENCY,
+           per_host=MAX_PER_HOST, timeout=TIMEOUT, on_progress=None, needs_embedding=None):
+    """
+    Download and parse many article URLs concurrently.
+
+    Downloads share one pooled httpx client, at most `concurrency` at a time and
+    `per_host` per host, each bounded by `timeout` seconds, so one slow site only
+    delays itself. HTML is converted to text in a process pool. If splitter and
+    embeddings are given, each article is split and embedded as soon as it is
+    parsed, overlapping with the remaining downloads; pass needs_embedding(document)
+    to embed only the articles it returns True for, e.g. those not already
+    indexed unchanged. on_progress(done, total, url, ok) is called as each URL
+    finishes.
+
+    Returns (documents, failures, timings): one Document per successful URL in
+    input order with metadata["source"] set like UnstructuredURLLoader's, a dict
+    of url -> error message, and per-URL fetch/parse/embed seconds.
+    """
+    urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+    if not urls:
+        return [], {}, {}
+    documents, failures, timings = asyncio.run(
+        _ingest(urls, parse, splitter, embeddings, needs_embedding, concurrency, per_host, timeout, on_progress))
+    return [documents[url] for url in urls if url in documents], failures, timings
@@ -0,0 +1,143 @@
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Worker threads shared by every session of the server process
+MAX_WORKERS = 2
+# Finished jobs kept for result retrieval before the oldest are dropped
+MAX_FINISHED_JOBS = 100
+
+class JobCancelled(Exception):
+    """Raised inside a job when it reports progress after cancel() was requested."""
+
+class Job:
+    """
+    A unit of background work. The job function receives the Job as its first
+    argument and calls job.report(fraction, message) to publish progress; that
+    call also raises JobCancelled once the job has been cancelled.
+    """
+
+    def __init__(self, func, args, kwargs, name, max_retries, backoff_seconds, max_backoff_seconds):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name or getattr(func, "__name__", "job")
+        self.func, self.args, self.kwargs = func, args, kwargs
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = pd.Timestamp.now()
+        self.finished_at = None
+        self.next_retry_at = None
+        self._cancel_event = threading.Event()
+        self._timer = None
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self):
+        return self.status in FINISHED_STATES
+
+    def report(self, fraction, message=None):
+        if self.cancelled:
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fypy-job")
+_jobs = {}
+_lock = threading.Lock()
+
+def _finish(job, status):
+    job.status = status
+    job.finished_at = pd.Timestamp.now()
+    with _lock:
+        finished = sorted((j for j in _jobs.values() if j.done), key=lambda j: j.finished_at)
+        for old in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del _jobs[old.id]
+
+def _run(job):
+    if job.cancelled:
+        if not job.done:
+            _finish(job, CANCELLED)
+        return
+    job.status = RUNNING
+    job.attempts += 1
+    job.next_retry_at = None
+    try:
+        job.result = job.func(job, *job.args, **job.kwargs)
+    except JobCancelled:
+        _finish(job, CANCELLED)
+    except Exception as e:
+        job.error = f"{e}\n{traceback.format_exc()}"
+        if job.attempts <= job.max_retries and not job.cancelled:
+            # Schedule the retry instead of sleeping on a worker thread
+            delay = min(job.backoff_seconds * 2 ** (job.attempts - 1), job.max_backoff_seconds)
+            job.status = RETRYING
+            job.message = f"Attempt {job.attempts} failed: {e}. Retrying in {delay:.0f}s"
+            job.next_retry_at = pd.Timestamp.now() + pd.Timedelta(seconds=delay)
+            job._timer = threading.Timer(delay, _executor.submit, args=(_run, job))
+            job._timer.daemon = True
+            job._timer.start()
+        else:
+            job.message = f"Failed after {job.attempts} attempt(s): {e}"
+            _finish(job, FAILED)
+    else:
+        job.progress = 1.0
+        _finish(job, SUCCEEDED)
+
+def submit(func, *args, name=None, max_retries=0, backoff_seconds=5, max_backoff_seconds=300, **kwargs):
+    """
+    Run func(job, *args, **kwargs) on the background worker pool and return its job id.
+    Failed attempts are retried up to max_retries times with exponential backoff
+    (backoff_seconds, doubled per attempt, capped at max_backoff_seconds).
+    """
+    job = Job(func, args, kwargs, name, max_retries, backoff_seconds, max_backoff_seconds)
+    with _lock:
+        _jobs[job.id] = job
+    _executor.submit(_run, job)
+    return job.id
+
+def get_job(job_id):
+    """Return the Job for job_id, or None if it is unknown or has been evicted."""
+    with _lock:
+        return _jobs.get(job_id)
+
+def cancel(job_id):
+    """
+    Request cancellation. Queued and retry-waiting jobs stop immediately; running
+    jobs stop at their next progress report. Returns False if the job already finished.
+    """
+    job = get_job(job_id)
+    if job is None or job.done:
+        return False
+    job._cancel_event.set()
+    if job.status == RETRYING and job._timer is not None:
+        job._timer.cancel()
+    if job.status in (QUEUED, RETRYING):
+        _finish(job, CANCELLED)
+    return True
+
+def list_jobs(name=None):
+    """Return known jobs, most recently submitted first, optionally filtered by name."""
+    with _lock:
+        jobs = [j for j in _jobs.values() if name is None or j.name == name]
+    return sorted(jobs, key=lambda j: j.submitted_at, reverse=True)
@@ -0,0 +1,179 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score, calinski_harabasz_score
+from threadpoolctl import threadpool_limits
+
+# Selectable k-selection criteria
+SILHOUETTE = "silhouette"                  # exact silhouette, O(n^2)
+SAMPLED_SILHOUETTE = "sampled_silhouette"  # silhouette on a random sample of points
+CALINSKI_HARABASZ = "calinski_harabasz"    # variance ratio, O(n)
+ELBOW = "elbow"                            # knee of the inertia curve, O(n)
+STRATEGIES = (SILHOUETTE, SAMPLED_SILHOUETTE, CALINSKI_HARABASZ, ELBOW)
+
+def _fit_k(X, k, strategy, sample_size, random_state):
+    """Fit K-Means for one k and score it. Runs in a worker process."""
+    start = time.perf_counter()
+    kmeans = KMeans(n_clusters=k, random_state=random_state)
+    labels = kmeans.fit_predict(X)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if strategy == SILHOUETTE:
+        score = silhouette_score(X, labels)
+    elif strategy == SAMPLED_SILHOUETTE:
+        score = silhouette_score(X, labels, sample_size=min(sample_size, len(X)), random_state=random_state)
+    elif strategy == CALINSKI_HARABASZ:
+        score = calinski_harabasz_score(X, labels)
+    else:
+        score = np.nan  # Elbow is scored once the whole inertia curve is known
+    score_seconds = time.perf_counter() - start
+    return {
+        'k': k,
+        'labels': labels,
+        'inertia': kmeans.inertia_,
+        'score': score,
+        'fit_seconds': fit_seconds,
+        'score_seconds': score_seconds,
+    }
+
+def _elbow_scores(ks, inertias):
+    """Distance of each point from the chord joining the ends of the normalized inertia curve."""
+    ks, inertias = np.asarray(ks, dtype=float), np.asarray(inertias, dtype=float)
+    if len(ks) < 3:
+        return np.zeros(len(ks))
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    spread = inertias[0] - inertias[-1]
+    y = (inertias - inertias[-1]) / spread if spread else np.zeros(len(ks))
+    return np.abs(x + y - 1) / np.sqrt(2)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _init_worker():
+    """Keep each worker's BLAS and OpenMP pools to one thread; the pool already has one worker per CPU."""
+    os.environ["OMP_NUM_THREADS"] = "1"
+    threadpool_limits(limits=1)
+
+def _get_pool():
+    """
+    Worker processes shared by every select_k call, created on first use. They are
+    spawned rather than forked because callers may be running on worker threads,
+    and run single-threaded native code so the CPU is not oversubscribed.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker)
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def select_k(X, k_range=range(2, 11), strategy=SILHOUETTE, sample_size=1000, parallel=True,
+             patience=None, time_budget=None, random_state=42):
+    """
+    Fit K-Means for every candidate k and pick the best one under the chosen strategy.
+
+    Candidate fits run on a shared process pool (parallel=False fits in-process,
+    one after another). Results are consumed in k order: with patience set,
+    selection stops once the score has not improved for that many consecutive k,
+    and with time_budget (seconds) it stops accepting results after the budget;
+    pending fits are cancelled either way. The elbow strategy needs the whole inertia curve, so
+    it ignores patience.
+
+    Returns a dict with the selected 'k', its 'score' and 'labels', the 'strategy',
+    whether selection 'stopped_early', and a 'timings' DataFrame with per-k fit and
+    scoring times, inertia and score.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown k-selection strategy: {strategy}")
+    ks = [k for k in k_range if k < len(X)]
+    if not ks:
+        raise ValueError("Not enough samples to evaluate any k.")
+
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+    args = (strategy, sample_size, random_state)
+    results = {}
+    stopped_early = False
+    best_score, since_best = -np.inf, 0
+
+    def accept(result):
+        nonlocal best_score, since_best
+        results[result['k']] = result
+        if strategy == ELBOW or patience is None:
+            return False
+        if result['score'] > best_score:
+            best_score, since_best = result['score'], 0
+        else:
+            since_best += 1
+        return since_best >= patience
+
+    def run_sequential(pending):
+        for k in pending:
+            if accept(_fit_k(X, k, *args)) or (deadline is not None and time.perf_counter() > deadline):
+                return k != pending[-1]
+        return False
+
+    if not parallel:
+        stopped_early = run_sequential(ks)
+    else:
+        futures = {}
+        pending = list(ks)
+        try:
+            executor = _get_pool()
+            futures = {k: executor.submit(_fit_k, X, k, *args) for k in ks}
+            while pending:
+                timeout = max(deadline - time.perf_counter(), 0) if deadline is not None else None
+                wait([futures[pending[0]]], timeout=timeout, return_when=FIRST_COMPLETED)
+                if not futures[pending[0]].done():
+                    stopped_early = True  # Time budget exhausted
+                    break
+                # Consume finished fits strictly in k order so early stopping is deterministic
+                stop = False
+                while pending and futures[pending[0]].done() and not stop:
+                    stop = accept(futures[pending[0]].result())
+                    pending.pop(0)
+                if stop:
+                    stopped_early = bool(pending)
+                    break
+        except BrokenProcessPool:
+            # A worker died: replace the pool for later calls and finish in-process
+            _reset_pool()
+            stopped_early = run_sequential(pending)
+            pending = []
+        finally:
+            # Drop fits that have not started; running ones finish and are ignored
+            for k in pending:
+                if k in futures:
+                    futures[k].cancel()
+
+    if not results:
+        raise TimeoutError("No k could be evaluated within the time budget.")
+
+    timings = pd.DataFrame([{key: r[key] for key in ('k', 'fit_seconds', 'score_seconds', 'inertia', 'score')}
+                            for r in sorted(results.values(), key=lambda r: r['k'])])
+    if strategy == ELBOW:
+        timings['score'] = _elbow_scores(timings['k'], timings['inertia'])
+    best_k = int(timings.loc[timings['score'].idxmax(), 'k'])
+    return {
+        'k': best_k,
+        'score': float(timings['score'].max()),
+        'labels': results[best_k]['labels'],
+        'strategy': strategy,
+        'stopped_early': stopped_early,
+        'elapsed_seconds': time.perf_counter() - start,
+        'timings': timings,
+    }
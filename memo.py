@@ -0,0 +1,48 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache
+
+class SharedMemo:
+    """
+    Process-wide memo of results computed on a thread pool and shared by every
+    session. Entries are futures, so concurrent callers asking for the same key
+    wait on one computation instead of starting their own. At most maxsize
+    results are kept (least recently used evicted); failed computations are
+    dropped so the next call retries them.
+    """
+
+    def __init__(self, maxsize=32, max_workers=4, thread_name_prefix="fypy-memo"):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.hits = 0
+        self.misses = 0
+
+    def submit(self, key, func, *args, **kwargs):
+        """Return a future for func(*args, **kwargs), reusing a cached or in-flight one for key."""
+        with self._lock:
+            future = self._cache.get(key)
+            if future is not None:
+                self.hits += 1
+                return future
+            self.misses += 1
+            future = self._executor.submit(func, *args, **kwargs)
+            self._cache[key] = future
+        future.add_done_callback(lambda f: self._drop_failed(key, f))
+        return future
+
+    def _drop_failed(self, key, future):
+        if future.cancelled() or future.exception() is not None:
+            with self._lock:
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+def file_signature(file_path):
+    """Cheap fingerprint of a file for memo keys: absolute path, mtime and size."""
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
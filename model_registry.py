@@ -0,0 +1,97 @@
+import time
+import threading
+
+try:
+    import psutil
+except ImportError:  # Resident memory is reported as None
+    psutil = None
+
+# Model states
+REGISTERED = "registered"
+LOADING = "loading"
+LOADED = "loaded"
+FAILED = "failed"
+
+class _Entry:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.status = REGISTERED
+        self.error = None
+        self.load_seconds = None
+        self.rss_delta_mib = None
+        self.lock = threading.Lock()
+
+_entries = {}
+_registry_lock = threading.Lock()
+
+def _rss_mib():
+    return psutil.Process().memory_info().rss / 2 ** 20 if psutil is not None else None
+
+def register(name, loader):
+    """
+    Register a zero-argument loader under name. Nothing is loaded until get(name).
+    Re-registering an already loaded name keeps the loaded instance.
+    """
+    with _registry_lock:
+        if name not in _entries:
+            _entries[name] = _Entry(name, loader)
+        else:
+            _entries[name].loader = loader
+
+def get(name):
+    """
+    Return the model registered under name, loading it on first use. The instance
+    is a process-wide singleton shared by every session and rerun; concurrent first
+    callers wait for a single load.
+    """
+    entry = _entries[name]
+    if entry.status == LOADED:
+        return entry.value
+    with entry.lock:
+        if entry.status != LOADED:
+            entry.status = LOADING
+            rss_before = _rss_mib()
+            start = time.perf_counter()
+            try:
+                entry.value = entry.loader()
+            except Exception as e:
+                entry.status, entry.error = FAILED, str(e)
+                raise
+            entry.load_seconds = time.perf_counter() - start
+            rss_after = _rss_mib()
+            entry.rss_delta_mib = rss_after - rss_before if rss_after is not None else None
+            entry.error = None
+            entry.status = LOADED
+    return entry.value
+
+def is_loaded(name):
+    return name in _entries and _entries[name].status == LOADED
+
+def prewarm(*names):
+    """Load the named models on a background thread; already loaded or loading models are skipped."""
+    pending = [n for n in names if n in _entries and _entries[n].status in (REGISTERED, FAILED)]
+    if not pending:
+        return None
+
+    def load_all():
+        for name in pending:
+            try:
+                get(name)
+            except Exception:
+                pass  # Recorded on the entry; the next get() retries
+
+    thread = threading.Thread(target=load_all, name="model-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+def stats():
+    """Status, load time and approximate resident memory added by each registered model."""
+    return [{
+        'model': e.name,
+        'status': e.status,
+        'load_seconds': round(e.load_seconds, 2) if e.load_seconds is not None else None,
+        'rss_delta_mib': round(e.rss_delta_mib, 1) if e.rss_delta_mib is not None else None,
+        'error': e.error,
+    } for e in _entries.values()]
@@ -1,32 +1,88 @@
 import os
-import shutil
+import time
 import streamlit as st
 from dotenv import load_dotenv
-from langchain.chains import RetrievalQAWithSourcesChain
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import UnstructuredURLLoader
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_huggingface import HuggingFaceEndpoint
+import model_registry
+import vector_index
+from answer_stream import StreamingAnswer, visible_text
+from ingestion import ingest
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+import answer_cache
+import embedding_backend
 
 # ✅ Load environment variables FIRST
 load_dotenv()
 sec_key = os.getenv("HF_TOKEN")
 
-# ✅ Define the LLM model with Hugging Face Endpoint
+# Registry names of the bot's models
+LLM = "llm"
+EMBEDDINGS = "embeddings"
+
+# ✅ Define the LLM model with Hugging Face Endpoint (created on first use)
 repo_id = "mistralai/Mistral-7B-Instruct-v0.2"
-llm = HuggingFaceEndpoint(
-    repo_id=repo_id,
-    max_length=128,
-    temperature=0.7,
-    huggingfacehub_api_token=sec_key
-)
 
-# ✅ Use a better free embedding model
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
+# ✅ FYPY_LLM_BACKEND=ollama answers from a local Ollama server instead, for offline use
+llm_backend = os.getenv("FYPY_LLM_BACKEND", "huggingface")
+ollama_model = os.getenv("FYPY_OLLAMA_MODEL", "mistral")
+ollama_url = os.getenv("FYPY_OLLAMA_URL", "http://localhost:11434")
+
+def load_llm():
+    if llm_backend == "ollama":
+        from langchain_ollama import OllamaLLM
+        return OllamaLLM(model=ollama_model, base_url=ollama_url, num_predict=128, temperature=0.7)
+    from langchain_huggingface import HuggingFaceEndpoint
+    return HuggingFaceEndpoint(
+        repo_id=repo_id,
+        max_length=128,
+        temperature=0.7,
+        streaming=True,
+        huggingfacehub_api_token=sec_key
+    )
+
+# ✅ Use a better free embedding model (torch/transformers load on first use)
+embedding_model_name = "sentence-transformers/all-mpnet-base-v2"
+
+# Batch size, threads and precision; see embedding_backend.config_from_env
+embedding_config = embedding_backend.config_from_env()
+
+def load_embeddings():
+    return embedding_backend.TunedEmbeddings(embedding_model_name, **embedding_config)
+
+# Loaded lazily and shared by every session; see model_registry
+model_registry.register(LLM, load_llm)
+model_registry.register(EMBEDDINGS, load_embeddings)
+
+class RegistryEmbeddings(Embeddings):
+    """Stand-in that fetches the shared embedding model only when something is embedded."""
+
+    def embed_documents(self, texts):
+        return model_registry.get(EMBEDDINGS).embed_documents(texts)
+
+    def embed_query(self, text):
+        return model_registry.get(EMBEDDINGS).embed_query(text)
+
+# ✅ Lets the index be opened and browsed without loading torch; chunks embedded before are read from disk
+# Reduced-precision vectors differ slightly, so they are cached separately
+embedding_cache = EmbeddingCache(embedding_model_name if embedding_config["precision"] == embedding_backend.FLOAT32
+                                 else f"{embedding_model_name}@{embedding_config['precision']}")
+embeddings = CachedEmbeddings(RegistryEmbeddings(), embedding_cache)
+
+# ✅ Near-duplicate questions against the same index version reuse an earlier answer
+cached_answers = answer_cache.AnswerCache(**answer_cache.config_from_env())
+
+def format_stats(stats):
+    if stats.get("cached"):
+        return f"Cached answer to \"{stats['question']}\" (similarity {stats['similarity']:.2f}) · {stats['total_s']:.2f}s"
+    if stats["ttft_s"] is None:
+        return f"{stats['total_s']:.2f}s"
+    return (f"First token {stats['ttft_s']:.2f}s · {stats['tokens']} tokens at "
+            f"{stats['tokens_per_s'] or 0:.1f} tokens/s · {stats['total_s']:.2f}s total")
 
 # ✅ Define the page rendering function
 def show_page():
+    file_path = vector_index.INDEX_DIR
     # Streamlit UI Setup
     st.title("FyPy: An AI-Powered Equity Analysis Tool")
     st.caption("Your AI Stock Research Chatbot - FyPy Advisor")
@@ -42,6 +98,18 @@ def show_page():
              - 🔍 Financial Insights  
          """)
         st.divider()
+        st.markdown('### Models')
+        if st.button("Pre-load models"):
+            model_registry.prewarm(EMBEDDINGS, LLM)
+        st.dataframe(model_registry.stats(), hide_index=True)
+        st.dataframe([embedding_cache.stats()], hide_index=True)
+        answer_stats = cached_answers.stats()
+        st.caption(f"Answer cache: {answer_stats['entries']} answers, hit rate "
+                   f"{answer_stats['hit_rate'] or 0:.0%} ({answer_stats['hits']}/{answer_stats['hits'] + answer_stats['misses']})")
+        if model_registry.is_loaded(EMBEDDINGS):
+            st.dataframe([model_registry.get(EMBEDDINGS).stats()], hide_index=True)
+        st.caption(f"Index version: {vector_index.current_version(file_path) or 'none'}")
+        st.divider()
 
     # Managing Session State
     if "message_log" not in st.session_state:
@@ -49,32 +117,49 @@ def show_page():
 
     # Sidebar for URL Input
     st.sidebar.title("Stock Article URLs")
-    file_path = "vectorIndex_mistral"
-    urls = [st.sidebar.text_input(f"URL {i+1}") for i in range(3)]
+    urls = st.sidebar.text_area("Article URLs (one per line)", height=150).splitlines()
     process_url_clicked = st.sidebar.button("Process URLs")
 
+    # Indexed Sources
+    index = vector_index.get_index(embeddings, file_path)
+    if index is not None:
+        sources = index.sources()
+        st.sidebar.caption(f"{len(sources)} articles, {sum(sources.values())} chunks indexed")
+        remove_urls = st.sidebar.multiselect("Indexed articles", list(sources))
+        col1, col2 = st.sidebar.columns(2)
+        if col1.button("Remove selected", disabled=not remove_urls):
+            _, removed = vector_index.remove_sources(remove_urls, embeddings, file_path)
+            st.session_state.message_log.append({"role": "ai", "content": f"Removed {len(remove_urls)} articles ({removed} chunks)."})
+            st.rerun()
+        if col2.button("Compact index"):
+            vector_index.compact(embeddings, file_path)
+            st.rerun()
+
     if process_url_clicked:
-        if os.path.exists(file_path):
-            if os.path.isdir(file_path):
-                shutil.rmtree(file_path)  # ✅ Remove directory
-            else:
-                os.remove(file_path)
-        loader = UnstructuredURLLoader(urls=[url for url in urls if url])
         st.session_state.message_log.append({"role": "ai", "content": "Processing URLs..."})
-
-        data = loader.load()
         text_splitter = RecursiveCharacterTextSplitter(
             separators=["\n\n", "\n", ".", ","],
             chunk_size=300,
             chunk_overlap=20
         )
-        docs = text_splitter.split_documents(data)
-
-        # ✅ Save embeddings using FAISS
-        vectorstore = FAISS.from_documents(docs, embeddings)
-        vectorstore.save_local(file_path)
 
-        st.session_state.message_log.append({"role": "ai", "content": "URLs processed and stored successfully!"})
+        # ✅ Fetch, parse and embed concurrently; embedded chunks land in the embedding cache.
+        # Articles indexed with the same text are skipped, as the update will not embed them.
+        progress = st.sidebar.progress(0.0, text="Fetching articles...")
+        data, failures, _ = ingest(
+            urls, splitter=text_splitter, embeddings=embeddings,
+            needs_embedding=(lambda document: not index.unchanged(document)) if index is not None else None,
+            on_progress=lambda done, total, url, ok: progress.progress(done / total, text=f"{done}/{total} articles"))
+        for url, error in failures.items():
+            st.session_state.message_log.append({"role": "ai", "content": f"Could not process {url}: {error}"})
+
+        # ✅ Embed only new or changed chunks; questions keep using the previous version until this one is published
+        summary = vector_index.update_documents(data, embeddings, text_splitter, file_path)
+
+        st.session_state.message_log.append({"role": "ai", "content": (
+            f"URLs processed and stored successfully! {summary['added_chunks']} new chunks embedded, "
+            f"{summary['kept_chunks']} reused, {summary['removed_chunks']} removed, "
+            f"{summary['unchanged_urls']} articles unchanged.")})
         st.rerun()
 
     # Initiate the Chat Container
@@ -85,32 +170,64 @@ def show_page():
         for message in st.session_state.message_log:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+                if message.get("stats"):
+                    st.caption(format_stats(message["stats"]))
 
-    # Function to Generate AI Response
+    # Function to Generate AI Response, streamed into the current chat message
     def generate_ai_response(query):
-        if os.path.exists(file_path):
-            # ✅ Load FAISS vector store
-            vectorstore = FAISS.load_local(file_path, embeddings, allow_dangerous_deserialization=True)
-            
-            # ✅ Use the correct LLM instance
-            chain = RetrievalQAWithSourcesChain.from_llm(llm=llm, retriever=vectorstore.as_retriever())
-
-            result = chain({"question": query}, return_only_outputs=True)
-
-            response = result["answer"]
-            sources = result.get("sources", "")
-            if sources:
-                response += f"\n\n*Sources:*\n" + "\n".join(sources.split("\n"))
-            return response
-        else:
-            return "No stock data available. Please process URLs first."
+        # ✅ Resident FAISS index, reloaded only after Process URLs publishes a new version
+        index = vector_index.get_index(embeddings, file_path)
+        if index is None:
+            response = "No stock data available. Please process URLs first."
+            st.markdown(response)
+            return response, None
+
+        # ✅ Answer near-duplicates from the answer cache; the embedding is reused by the retriever
+        start = time.perf_counter()
+        query_vector = embeddings.embed_query(query)
+        cached = cached_answers.get(query_vector, index.version, query)
+        if cached is not None:
+            response = cached["answer"]
+            if cached["sources"]:
+                response += f"\n\n*Sources:*\n" + "\n".join(cached["sources"].split("\n"))
+            st.markdown(response)
+            stats = {"cached": True, "question": cached["question"], "similarity": cached["similarity"],
+                     "total_s": time.perf_counter() - start}
+            st.caption(format_stats(stats))
+            return response, stats
+
+        # ✅ Use the correct LLM instance
+        chain = index.chain(model_registry.get(LLM))
+
+        placeholder = st.empty()
+        placeholder.markdown("..Processing")
+        answer = StreamingAnswer(chain, query)
+        for text in answer:
+            placeholder.markdown(visible_text(text) + "▌")
+
+        response = answer.result["answer"]
+        sources = answer.result.get("sources", "")
+        if sources:
+            response += f"\n\n*Sources:*\n" + "\n".join(sources.split("\n"))
+        placeholder.markdown(response)
+        cached_answers.put(query_vector, index.version, query, answer.result["answer"], sources)
+        stats = answer.stats()
+        st.caption(format_stats(stats))
+        return response, stats
 
     # User Input
     user_query = st.chat_input("Type your stock-related questions...")
 
     if user_query:
         st.session_state.message_log.append({"role": "user", "content": user_query})
-        with st.spinner("..Processing"):
-            ai_response = generate_ai_response(user_query)
-        st.session_state.message_log.append({"role": "ai", "content": ai_response})
-        st.rerun()
\ No newline at end of file
+        # ✅ Render only the new messages; the log above is already on screen
+        with chat_container:
+            with st.chat_message("user"):
+                st.markdown(user_query)
+            with st.chat_message("ai"):
+                try:
+                    ai_response, stats = generate_ai_response(user_query)
+                except Exception as e:
+                    ai_response, stats = f"Could not generate an answer: {e}", None
+                    st.error(ai_response)
+        st.session_state.message_log.append({"role": "ai", "content": ai_response, "stats": stats})
\ No newline at end of file
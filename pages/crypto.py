@@ -2,9 +2,14 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
-import time
 from datetime import datetime, timedelta
-from sklearn.cluster import KMeans
+import jobs
+from excel_cache import load_workbook, iter_sheets
+from cluster_model import MODEL_PATH as CLUSTER_MODEL_PATH, fit_model, partial_fit, unseen, predict_clusters, load_model, save_model, model_lock
+from prediction_store import STORE_DIR as PREDICTION_STORE_DIR, append_predictions, read_predictions, store_exists, migrate_csv
+
+# Flat CSV log used before the partitioned prediction store
+LEGACY_PREDICTIONS_LOG = 'predictions_log.csv'
 
 # ============
 # DATA LOADING
@@ -14,25 +19,21 @@ def load_data(file_path):
     """
     Load an Excel file with multiple sheets from the local filesystem.
     Combines all sheets into one DataFrame with a MultiIndex (Coin, Index).
+    The parsed workbook is cached on disk and reused until the file changes.
     """
     try:
-        excel_file = pd.ExcelFile(file_path)
+        combined_data = load_workbook(
+            file_path,
+            names=["Coin", "Index"],
+            on_sheet_error=lambda sheet_name, e: st.write(f"Error reading sheet {sheet_name}: {e}"),
+        )
     except Exception as e:
         st.error(f"Error loading Excel file: {e}")
         return None
 
-    all_data = {}
-    for sheet_name in excel_file.sheet_names:
-        try:
-            sheet_data = excel_file.parse(sheet_name)
-            all_data[sheet_name] = sheet_data
-        except Exception as e:
-            st.write(f"Error reading sheet {sheet_name}: {e}")
-    if not all_data:
+    if combined_data is None:
         st.error("No sheets were loaded successfully.")
         return None
-
-    combined_data = pd.concat(all_data.values(), keys=all_data.keys(), names=["Coin", "Index"])
     return combined_data
 
 # ============
@@ -45,6 +46,11 @@ def extract_features(data):
     if len(prices) < 2:
         return None
 
+    # Latest non-null value of col; NaN if it has none, as in extract_all_features
+    def last_valid(col):
+        values = data[col].dropna()
+        return values.iloc[-1] if len(values) else np.nan
+
     prices['date'] = pd.to_datetime(prices['date'])
     first_date = prices['date'].iloc[0]
     last_date = prices['date'].iloc[-1]
@@ -84,10 +90,10 @@ def extract_features(data):
         'price_change': (prices['price'].iloc[-1] - prices['price'].iloc[0]) / prices['price'].iloc[0] if prices['price'].iloc[0] != 0 else 0,
         'token': data['token'].iloc[0] if 'token' in data.columns else None,
         'contract_address': data['contract_address'].iloc[0] if 'contract_address' in data.columns else None,
-        'market_cap': data['market_cap'].dropna().iloc[-1] if 'market_cap' in data.columns else None,
+        'market_cap': last_valid('market_cap') if 'market_cap' in data.columns else None,
         'age_in_months': age_in_months,
         'Chain': data['platform'].iloc[0] if 'platform' in data.columns else None,
-        'Trading Volume': data['volume'].dropna().iloc[-1] if 'volume' in data.columns else None,
+        'Trading Volume': last_valid('volume') if 'volume' in data.columns else None,
         'twitter_followers': data['twitter_followers'].iloc[0] if 'twitter_followers' in data.columns else None,
         'price': prices['price'].iloc[-1],
         'prediction_date': data['date'].iloc[-1],
@@ -95,140 +101,394 @@ def extract_features(data):
     features.update(price_changes)
     return features
 
+# Column order of a feature row, matching the dict built by extract_features.
+FEATURE_COLUMNS = [
+    'mean_price', 'std_price', 'min_price', 'max_price', 'volatility', 'price_change',
+    'token', 'contract_address', 'market_cap', 'age_in_months', 'Chain', 'Trading Volume',
+    'twitter_followers', 'price', 'prediction_date',
+    'price_change_24h', 'price_change_7d', 'price_change_14d', 'price_change_30d',
+]
+
+# Look-back window (in rows) for each percentage price change.
+PRICE_CHANGE_WINDOWS = {
+    'price_change_24h': 2,
+    'price_change_7d': 7,
+    'price_change_14d': 14,
+    'price_change_30d': 30,
+}
+
+def extract_all_features(combined_data):
+    """
+    Vectorized counterpart of extract_features for the whole coin universe.
+    Computes every coin's features (MultiIndex level 0) in one grouped pass and
+    applies the same momentum filter. Returns one row per surviving coin with
+    FEATURE_COLUMNS plus 'Coin', in the same order the per-coin loop produced.
+    """
+    coins = combined_data.index.get_level_values(0)
+    columns = combined_data.columns
+
+    # Parse dates once for the whole universe and sort each coin's series by date
+    valid = combined_data[['date', 'price']].dropna()
+    prices = pd.DataFrame({
+        'Coin': valid.index.get_level_values(0),
+        'date': pd.to_datetime(valid['date']).values,
+        'price': valid['price'].values,
+    }).sort_values(['Coin', 'date'])
+
+    grouped = prices.groupby('Coin', sort=True)
+    stats = grouped['price'].agg(['count', 'mean', 'min', 'max', 'first', 'last'])
+    stats['std'] = grouped['price'].std(ddof=0)
+    stats['first_date'] = grouped['date'].first()
+    stats['last_date'] = grouped['date'].last()
+    stats = stats[stats['count'] >= 2]
+
+    # Price 'days' rows before the end of each series; missing windows count as 0
+    rows_from_end = grouped.cumcount(ascending=False)
+    for key, days in PRICE_CHANGE_WINDOWS.items():
+        start = prices.loc[rows_from_end == days - 1].set_index('Coin')['price'].reindex(stats.index)
+        change = (stats['last'] - start) / start * 100
+        stats[key] = change.where(start != 0, 0).fillna(0)
+
+    # Static attributes come from the first raw row; latest values from the last
+    first_rows = combined_data.loc[~coins.duplicated(keep='first')].droplevel(1)
+    last_rows = combined_data.loc[~coins.duplicated(keep='last')].droplevel(1)
+
+    def first_value(col):
+        return first_rows[col].reindex(stats.index) if col in columns else None
+
+    def last_valid(col):
+        return combined_data[col].groupby(level=0).last().reindex(stats.index) if col in columns else None
+
+    age_in_days = (stats['last_date'] - stats['first_date']).dt.days
+    features = pd.DataFrame({
+        'mean_price': stats['mean'],
+        'std_price': stats['std'],
+        'min_price': stats['min'],
+        'max_price': stats['max'],
+        'volatility': (stats['std'] / stats['mean']).where(stats['mean'] != 0, 0),
+        'price_change': ((stats['last'] - stats['first']) / stats['first']).where(stats['first'] != 0, 0),
+        'token': first_value('token'),
+        'contract_address': first_value('contract_address'),
+        'market_cap': last_valid('market_cap'),
+        'age_in_months': (age_in_days / 30.44).round(2),
+        'Chain': first_value('platform'),
+        'Trading Volume': last_valid('volume'),
+        'twitter_followers': first_value('twitter_followers'),
+        'price': stats['last'],
+        'prediction_date': last_rows['date'].reindex(stats.index),
+    }, index=stats.index)
+    for key in PRICE_CHANGE_WINDOWS:
+        features[key] = stats[key]
+
+    # Filter out coins based on conditions
+    dropped = ((features['price_change_24h'] < 0) & (features['price_change_7d'] < 0)) | (features['price_change_30d'] < -50)
+    return features[~dropped].assign(Coin=lambda f: f.index).reset_index(drop=True)
+
+def stream_features(file_path, on_sheet_error=None):
+    """
+    Streaming counterpart of load_data + extract_all_features: reads the workbook
+    one sheet (coin) at a time and keeps only its feature row, so peak memory is
+    bounded by the largest sheet rather than the whole workbook.
+    """
+    feature_data = []
+    for coin, coin_data in iter_sheets(file_path, on_sheet_error=on_sheet_error):
+        try:
+            features = extract_features(coin_data)
+        except KeyError as e:
+            if on_sheet_error is not None:
+                on_sheet_error(coin, e)
+            continue
+        if features:
+            features['Coin'] = coin
+            feature_data.append(features)
+    features_df = pd.DataFrame(feature_data, columns=FEATURE_COLUMNS + ['Coin'])
+    return features_df.sort_values('Coin', kind='stable').reset_index(drop=True)
+
 # ============
 # PREDICTION RECORDING & EVALUATION
 # ============
 
-def record_predictions(prediction_df, record_file='predictions_log.csv'):
+def record_predictions(prediction_df, store_dir=PREDICTION_STORE_DIR):
     """
-    Record prediction data to a CSV log.
+    Record prediction data to the partitioned prediction store.
     """
     prediction_df = prediction_df.copy()
     prediction_df['date'] = pd.Timestamp.now()
-    if os.path.exists(record_file):
-        prediction_df.to_csv(record_file, mode='a', header=False, index=False)
-    else:
-        prediction_df.to_csv(record_file, index=False)
-    st.write(f"Predictions recorded to {record_file}")
+    append_predictions(prediction_df, store_dir=store_dir)
+
+# Horizons (in days after the prediction) at which realized prices are evaluated
+EVALUATION_HORIZONS = (1, 3, 7)
 
-def evaluate_predictions(n_days=3, record_file='predictions_log.csv', updated_data=None):
+def build_price_history(combined_data):
+    """
+    Flatten the (Coin, Index) workbook frame into a date-sorted price history
+    with one row per (Coin, date), ready for an as-of join.
+    """
+    valid = combined_data[['date', 'price']].dropna()
+    history = pd.DataFrame({
+        'Coin': valid.index.get_level_values(0).astype(str),
+        'date': pd.to_datetime(valid['date']).values.astype('datetime64[ns]'),
+        'price': valid['price'].values,
+    })
+    return history.sort_values('date', kind='stable').reset_index(drop=True)
+
+def evaluate_horizons(predictions, history, horizons=EVALUATION_HORIZONS):
+    """
+    Evaluate every prediction at once against the price history.
+    For each horizon h, the realized price is the last price at or before
+    prediction_date + h days (one as-of join per horizon, by coin). Horizons that
+    run past a coin's last known date are left unrealized (NaN).
+    Returns one row per prediction with Actual_Price/Return/Error/Hit per horizon.
     """
-    Evaluate predictions older than n_days by comparing predicted price with latest actual price.
+    anchor = pd.to_datetime(predictions['prediction_date'], errors='coerce')
+    anchor = anchor.fillna(pd.to_datetime(predictions['date'])).values.astype('datetime64[ns]')
+    predicted = pd.to_numeric(predictions['price'], errors='coerce').values
+
+    evaluated = pd.DataFrame({
+        'Coin': predictions['Coin'].astype(str).values,
+        'Cluster': predictions['Cluster'].values if 'Cluster' in predictions.columns else None,
+        'Probability_Group': predictions['Probability_Group'].values if 'Probability_Group' in predictions.columns else None,
+        'Predicted_Price': predicted,
+        'prediction_date': anchor,
+        'date': pd.to_datetime(predictions['date']).values,
+    })
+    last_seen = history.groupby('Coin')['date'].max().reindex(evaluated['Coin']).values
+    rows = np.arange(len(evaluated))
+
+    for h in horizons:
+        target = anchor + np.timedelta64(h, 'D')
+        left = pd.DataFrame({'row': rows, 'Coin': evaluated['Coin'].values, 'target': target})
+        left = left.dropna(subset=['target']).sort_values('target', kind='stable')
+        joined = pd.merge_asof(left, history.rename(columns={'date': 'target'}),
+                               on='target', by='Coin', direction='backward')
+        realized = np.full(len(evaluated), np.nan)
+        realized[joined['row'].values] = joined['price'].values
+        realized[~(target <= last_seen)] = np.nan
+
+        realized_return = realized / predicted - 1
+        evaluated[f'Actual_Price_{h}d'] = realized
+        evaluated[f'Return_{h}d'] = realized_return
+        evaluated[f'Error_{h}d'] = realized - predicted
+        evaluated[f'Hit_{h}d'] = np.where(np.isnan(realized_return), np.nan, realized_return > 0)
+    return evaluated
+
+def summarize_hit_rates(evaluated, by, horizons=EVALUATION_HORIZONS):
     """
-    if not os.path.exists(record_file):
-        st.write("No prediction log file found for evaluation.")
+    Aggregate evaluate_horizons output per group (e.g. 'Probability_Group' or
+    'Cluster'): number of realized predictions, hit rate (share with a positive
+    return), mean return and mean absolute error for each horizon.
+    """
+    summaries = []
+    for h in horizons:
+        summary = evaluated.groupby(by, dropna=False).agg(
+            Evaluated=(f'Hit_{h}d', 'count'),
+            Hit_Rate=(f'Hit_{h}d', 'mean'),
+            Mean_Return=(f'Return_{h}d', 'mean'),
+            MAE=(f'Error_{h}d', lambda e: e.abs().mean()),
+        )
+        summary.insert(0, 'Horizon', f'{h}d')
+        summaries.append(summary.reset_index())
+    return pd.concat(summaries, ignore_index=True)
+
+def _sheet_frames(file_path, on_sheet_error=None):
+    """Yield each coin of a workbook as its own (Coin, Index) frame, one sheet in memory at a time."""
+    for coin, coin_data in iter_sheets(file_path, on_sheet_error=on_sheet_error):
+        yield pd.concat({coin: coin_data}, names=["Coin", "Index"])
+
+def evaluate_predictions(n_days=3, store_dir=PREDICTION_STORE_DIR, updated_data=None, horizons=EVALUATION_HORIZONS,
+                         stream_path=None):
+    """
+    Evaluate predictions older than n_days by comparing predicted price with latest actual price,
+    and with the realized price at each horizon, aggregated per Probability_Group and Cluster.
+    With stream_path, prices are read from that workbook one sheet at a time instead of from updated_data.
+    """
+    if not store_exists(store_dir):
+        st.write("No prediction store found for evaluation.")
         return
 
-    predictions_log = pd.read_csv(record_file)
-    predictions_log['date'] = pd.to_datetime(predictions_log['date'])
+    # Only partitions recorded on or before the cutoff are read
     cutoff_date = pd.Timestamp.now() - timedelta(days=n_days)
-    old_predictions = predictions_log[predictions_log['date'] <= cutoff_date]
+    old_predictions = read_predictions(store_dir, until=cutoff_date)
 
     if old_predictions.empty:
         st.write(f"No predictions older than {n_days} days to evaluate.")
         return
 
-    errors = []
-    error_details = []
-    for idx, row in old_predictions.iterrows():
-        coin = row['Coin']
-        predicted_price = row['price']
-        try:
-            coin_data = updated_data.loc[coin]
-            if isinstance(coin_data, pd.DataFrame):
-                actual_price = coin_data['price'].dropna().iloc[-1]
-            else:
-                actual_price = coin_data['price']
-        except Exception as e:
-            st.write(f"Could not retrieve data for coin {coin}: {e}")
+    # Join the latest known price, and the price history for each horizon, onto
+    # the predictions of the coins in each frame; one frame holds either the
+    # whole workbook or, when streaming, a single coin. Each frame's prediction
+    # rows are looked up by coin, so no frame scans every prediction.
+    frames = _sheet_frames(stream_path) if stream_path is not None else [updated_data]
+    coins = old_predictions['Coin'].astype(str)
+    positions = coins.groupby(coins).indices
+    matched = np.zeros(len(old_predictions), dtype=bool)
+    errors, evaluated = [], []
+    for frame in frames:
+        latest_prices = frame['price'].groupby(level=0).last()
+        latest_prices.index = latest_prices.index.astype(str)
+        found = [positions[coin] for coin in latest_prices.index if coin in positions]
+        if not found:
             continue
-
-        error = actual_price - predicted_price
-        errors.append(abs(error))
-        error_details.append({
-            'Coin': coin,
-            'Predicted_Price': predicted_price,
-            'Actual_Price': actual_price,
-            'Error': error,
-            'date': row['date']
-        })
-
-    if errors:
-        mae = np.mean(errors)
-        st.write(f"Mean Absolute Error over predictions older than {n_days} days: {mae:,.4f}")
-        errors_df = pd.DataFrame(error_details)
-        st.dataframe(errors_df)
-    else:
+        rows = np.sort(np.concatenate(found))
+        matched[rows] = True
+        predictions = old_predictions.iloc[rows]
+        actual_prices = coins.iloc[rows].map(latest_prices)
+        errors.append(pd.DataFrame({
+            'Coin': coins.iloc[rows],
+            'Predicted_Price': predictions['price'],
+            'Actual_Price': actual_prices,
+            'Error': actual_prices - predictions['price'],
+            'date': predictions['date'],
+        }))
+        evaluated.append(evaluate_horizons(predictions, build_price_history(frame), horizons)
+                         .set_axis(predictions.index))
+    if not matched.all():
+        # Coins missing from the workbook are still evaluated, as unrealized
+        unmatched = old_predictions[~matched]
+        errors.append(pd.DataFrame({'Coin': coins[~matched], 'Predicted_Price': unmatched['price'],
+                                    'Actual_Price': np.nan, 'Error': np.nan, 'date': unmatched['date']}))
+        empty_history = pd.DataFrame({'Coin': pd.Series(dtype=str), 'date': pd.Series(dtype='datetime64[ns]'),
+                                      'price': pd.Series(dtype=float)})
+        evaluated.append(evaluate_horizons(unmatched, empty_history, horizons).set_axis(unmatched.index))
+    errors_df = pd.concat(errors).sort_index()
+    evaluated = pd.concat(evaluated).sort_index()
+
+    missing = errors_df['Actual_Price'].isna()
+    if missing.any():
+        st.write(f"Could not retrieve data for coins: {', '.join(sorted(errors_df.loc[missing, 'Coin'].unique()))}")
+    errors_df = errors_df[~missing]
+
+    if errors_df.empty:
         st.write("No valid predictions were evaluated.")
+        return
+
+    mae = errors_df['Error'].abs().mean()
+    st.write(f"Mean Absolute Error over predictions older than {n_days} days: {mae:,.4f}")
+    st.dataframe(errors_df.reset_index(drop=True))
+
+    st.write("Hit rates by Probability Group:")
+    st.dataframe(summarize_hit_rates(evaluated, 'Probability_Group', horizons))
+    st.write("Hit rates by Cluster:")
+    st.dataframe(summarize_hit_rates(evaluated, 'Cluster', horizons))
 
 # ============
 # MODEL RETRAINING & CLUSTERING
 # ============
 
-def retrain_model(combined_data, record_file='predictions_log.csv'):
-    try:
-        st.write("Starting model retraining...")
-        feature_data = []
-        # Process each coin (MultiIndex level 0)
-        for coin, coin_data in combined_data.groupby(level=0):
-            features = extract_features(coin_data)
-            if features:
-                features['Coin'] = coin
-                feature_data.append(features)
-        if not feature_data:
-            st.write("No valid features extracted for retraining.")
-            return None
-
-        features_df = pd.DataFrame(feature_data)
-        # Convert numerical fields if needed
-        for col in ['market_cap', 'Trading Volume']:
-            if col in features_df.columns:
-                features_df[col] = pd.to_numeric(features_df[col], errors='coerce')
-
-        # Normalize selected numerical columns for clustering
-        norm_columns = ['mean_price', 'std_price', 'volatility', 'price_change']
-        features_normalized = features_df[norm_columns].apply(lambda x: (x - x.mean()) / x.std())
-
-        # Apply K-Means clustering
-        kmeans = KMeans(n_clusters=3, random_state=42)
-        features_df['Cluster'] = kmeans.fit_predict(features_normalized)
-
-        # Map clusters to probability groups based on average price_change
-        cluster_mapping = features_df.groupby('Cluster')['price_change'].mean().sort_values(ascending=False).index
-        mapping_dict = {}
-        if len(cluster_mapping) >= 3:
-            mapping_dict = {cluster_mapping[0]: '90% Uptrend',
-                            cluster_mapping[1]: '80% Uptrend',
-                            cluster_mapping[2]: '70% Uptrend'}
-        features_df['Probability_Group'] = features_df['Cluster'].map(mapping_dict)
-
-        # Filter coins based on Trading Volume and market_cap thresholds
-        filtered_features = features_df[
-            (features_df['Trading Volume'] >= 50000) & (features_df['market_cap'] >= 1_000_000)
-        ]
-
-        # Select up to 20 coins per probability group
-        final_clusters = filtered_features.groupby('Probability_Group', group_keys=False).apply(
-            lambda x: x.sample(n=20, random_state=42) if len(x) >= 20 else x.head(20)
-        )
+def retrain_model(combined_data, store_dir=PREDICTION_STORE_DIR, model_path=CLUSTER_MODEL_PATH, refit=False,
+                  progress=None, features_df=None):
+    """
+    Extract features, update the clustering model, pick up to 20 coins per
+    probability group and record them as predictions. Makes no Streamlit calls,
+    so it can run on a background worker; progress(fraction, message) is called
+    between stages. Pass features_df (e.g. from stream_features) to skip
+    extraction from combined_data. Returns the final clusters, or None if no
+    coin had features.
+    """
+    progress = progress or (lambda fraction, message=None: None)
+    if features_df is None:
+        progress(0.05, "Extracting features...")
+        # Extract features for every coin (MultiIndex level 0) in one pass
+        features_df = extract_all_features(combined_data)
+    if features_df.empty:
+        return None
+
+    # Convert numerical fields if needed
+    for col in ['market_cap', 'Trading Volume']:
+        if col in features_df.columns:
+            features_df[col] = pd.to_numeric(features_df[col], errors='coerce')
+
+    # Cluster on the normalized numerical columns with the persisted model:
+    # a fresh fit the first time, a warm-started refit on request, and otherwise
+    # an incremental update with only the coins that are new or changed since the
+    # model last saw them, which keeps cluster ids and their probability groups.
+    # Models saved before coins' values were recorded ('members') are refit once,
+    # and the lock keeps concurrent retrains from overwriting each other's update.
+    progress(0.4, "Clustering...")
+    norm_columns = ['mean_price', 'std_price', 'volatility', 'price_change']
+    with model_lock(model_path):
+        model = load_model(model_path)
+        if model is None:
+            model = fit_model(features_df, norm_columns, n_clusters=3)
+        elif refit or 'members' not in model:
+            model = fit_model(features_df, norm_columns, init_model=model)
+        else:
+            model = partial_fit(model, unseen(model, features_df))
+        save_model(model, model_path)
+    features_df['Cluster'], features_df['Probability_Group'] = predict_clusters(model, features_df)
 
-        # Append current timestamp
-        final_clusters['date'] = pd.Timestamp.now()
+    # Filter coins based on Trading Volume and market_cap thresholds
+    filtered_features = features_df[
+        (features_df['Trading Volume'] >= 50000) & (features_df['market_cap'] >= 1_000_000)
+    ]
 
-        # Reformat fields for display
-        for col in ['market_cap', 'Trading Volume']:
-            final_clusters[col] = final_clusters[col].apply(lambda x: f"{x:,.0f}" if pd.notna(x) else x)
+    # Select up to 20 coins per probability group
+    final_clusters = filtered_features.groupby('Probability_Group', group_keys=False).apply(
+        lambda x: x.sample(n=20, random_state=42) if len(x) >= 20 else x.head(20)
+    )
 
+    # Append current timestamp
+    final_clusters['date'] = pd.Timestamp.now()
+
+    # Reformat fields for display
+    for col in ['market_cap', 'Trading Volume']:
+        final_clusters[col] = final_clusters[col].apply(lambda x: f"{x:,.0f}" if pd.notna(x) else x)
+
+    # Log the predictions
+    progress(0.9, "Recording predictions...")
+    record_predictions(final_clusters, store_dir=store_dir)
+    return final_clusters
+
+def run_retraining_job(job, combined_data, refit=False, stream_path=None):
+    """
+    Background job wrapper around retrain_model that reports progress to the job.
+    With stream_path, features are streamed from that workbook instead of combined_data.
+    """
+    features_df = None
+    if stream_path is not None:
+        job.report(0.05, "Streaming features sheet by sheet...")
+        features_df = stream_features(stream_path)
+    return retrain_model(combined_data, store_dir=PREDICTION_STORE_DIR, refit=refit,
+                         progress=job.report, features_df=features_df)
+
+# ============
+# RETRAINING JOB STATUS
+# ============
+
+def show_retraining_result(job):
+    if job.status == jobs.SUCCEEDED:
+        final_clusters = job.result
+        if final_clusters is None:
+            st.write("No valid features extracted for retraining.")
+            return
         st.write("Retrained Clusters (Predictions):")
         st.dataframe(final_clusters)
-
-        # Log the predictions
-        record_predictions(final_clusters, record_file=record_file)
+        st.write(f"Predictions recorded to {PREDICTION_STORE_DIR}")
         st.write("Model retraining completed successfully.")
-        return final_clusters
-    except Exception as e:
-        st.error(f"Error encountered during retraining: {e}")
-        raise
+        csv = final_clusters.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            label="Download Final Clustered Coins CSV",
+            data=csv,
+            file_name="final_clustered_coins.csv",
+            mime="text/csv"
+        )
+    elif job.status == jobs.FAILED:
+        st.error(f"Error encountered during retraining: {job.message}")
+        st.error("Max retries reached. Please check the error logs and data integrity.")
+    else:
+        st.warning("Retraining was cancelled.")
+
+@st.fragment(run_every=2)
+def poll_retraining_job(job_id):
+    """Poll the running job every two seconds without rerunning the whole page."""
+    job = jobs.get_job(job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=job.message or f"Retraining {job.status}...")
+    if job.status == jobs.RETRYING:
+        st.write(f"Next attempt at {job.next_retry_at:%H:%M:%S}.")
+    if st.button("Cancel Retraining"):
+        jobs.cancel(job_id)
 
 # ============
 # MAIN STREAMLIT APP
@@ -244,44 +504,55 @@ def show_page():
         st.error(f"Data file not found at {file_path}. Please ensure the file exists.")
         return
 
-    combined_data = load_data(file_path)
-    if combined_data is None:
-        st.error("Failed to load data.")
-        return
+    # Streaming never materializes the whole workbook: the preview is the first
+    # sheet, and evaluation and retraining read one sheet at a time
+    streaming = st.checkbox("Stream workbook sheet by sheet (low memory)", value=False)
+    if streaming:
+        combined_data = None
+        first_sheet = next(_sheet_frames(file_path, on_sheet_error=lambda sheet_name, e: st.write(
+            f"Error reading sheet {sheet_name}: {e}")), None)
+        if first_sheet is None:
+            st.error("No sheets were loaded successfully.")
+            return
+        st.write("Streaming the workbook. Preview of its first sheet:")
+        st.dataframe(first_sheet.head())
+    else:
+        combined_data = load_data(file_path)
+        if combined_data is None:
+            st.error("Failed to load data.")
+            return
 
-    st.write("Data loaded successfully. Preview of the combined data:")
-    st.dataframe(combined_data.head())
+        st.write("Data loaded successfully. Preview of the combined data:")
+        st.dataframe(combined_data.head())
+
+    # One-shot import of the legacy flat CSV log; a no-op once migrated
+    if os.path.exists(LEGACY_PREDICTIONS_LOG):
+        migrate_csv(LEGACY_PREDICTIONS_LOG, store_dir=PREDICTION_STORE_DIR)
 
     # Optionally evaluate old predictions if available
-    if os.path.exists('predictions_log.csv'):
+    if store_exists(PREDICTION_STORE_DIR):
         st.subheader("Evaluating Old Predictions")
-        evaluate_predictions(n_days=3, record_file='predictions_log.csv', updated_data=combined_data)
-
-    if st.button("Run Clustering and Retraining"):
-        final_clusters = None
-        retry_delay_seconds = 60
-        max_retries = 5
-        retries = 0
-        while retries < max_retries:
-            try:
-                final_clusters = retrain_model(combined_data, record_file='predictions_log.csv')
-                break
-            except Exception as e:
-                retries += 1
-                st.write(f"Retraining failed (attempt {retries}/{max_retries}). Retrying in {retry_delay_seconds} seconds...")
-                time.sleep(retry_delay_seconds)
-        else:
-            st.error("Max retries reached. Please check the error logs and data integrity.")
-            return
+        evaluate_predictions(n_days=3, store_dir=PREDICTION_STORE_DIR, updated_data=combined_data,
+                             stream_path=file_path if streaming else None)
+
+    # Retraining runs on the background job pool; failures are retried with
+    # backoff there instead of sleeping on the script thread.
+    refit = st.checkbox("Refit clustering model on all coins", value=False)
+    job = jobs.get_job(st.session_state.get("retrain_job_id"))
+    running = job is not None and not job.done
+    if st.button("Run Clustering and Retraining", disabled=running):
+        st.session_state.retrain_job_id = jobs.submit(
+            run_retraining_job, combined_data, refit=refit,
+            stream_path=file_path if streaming else None,
+            name="crypto_retrain", max_retries=4, backoff_seconds=60,
+        )
+        job = jobs.get_job(st.session_state.retrain_job_id)
+        running = True
 
-        if final_clusters is not None:
-            csv = final_clusters.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Download Final Clustered Coins CSV",
-                data=csv,
-                file_name="final_clustered_coins.csv",
-                mime="text/csv"
-            )
+    if running:
+        poll_retraining_job(job.id)
+    elif job is not None:
+        show_retraining_result(job)
 
 if __name__== '_main_':
-    show_page()
\ No newline at end of file
+    show_page()
@@ -1,8 +1,101 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import time
 from datetime import datetime
 from utils import generate_time_series
+import figure_cache
+import downsample
+
+# Date range of the Portfolio Performance chart
+PORTFOLIO_RANGE = ("2024-01-01", "2024-03-14")
+
+# Starting value and daily trend of the synthetic portfolio series
+PORTFOLIO_BASE = 3200000
+PORTFOLIO_TREND = 5000
+
+# Chart width assumed when choosing how many points to draw, in pixels (the app uses the wide layout)
+CHART_WIDTH = 1200
+
+def _portfolio_series(start, end):
+    """The portfolio series from start to end, generated once per range."""
+    key = ("portfolio", start, end)
+    return figure_cache.data(key, lambda: generate_time_series(start, end, PORTFOLIO_BASE, PORTFOLIO_TREND,
+                                                               seed=figure_cache.seed(key)))
+
+def _portfolio_figure(df, x_range):
+    """
+    The drawn positions of df and their figure, showing x_range downsampled
+    for CHART_WIDTH, with the highlight at the first of them.
+    """
+    kept = downsample.downsample(df['Date'], df['Value'], x_range, CHART_WIDTH)
+    points = df.iloc[kept]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=points['Date'], y=points['Value'],
+        mode='lines',
+        name='Portfolio Value',
+        line=dict(color='#3b82f6', width=2),
+        hovertemplate='Date: %{x|%b %d, %Y}<br>Value: ₹%{y:,.0f}<extra></extra>'
+    ))
+    fig.add_vline(x=points['Date'].iloc[0], line_width=2, line_dash="dot", line_color="orange")
+    fig.add_annotation(
+        x=points['Date'].iloc[0], y=points['Value'].iloc[0],
+        text=f"₹{points['Value'].iloc[0]:,.0f}",
+        showarrow=True, arrowhead=1, ax=40, ay=-40
+    )
+    fig.update_layout(
+        plot_bgcolor='white', paper_bgcolor='white',
+        margin=dict(t=20, l=20, r=20, b=20),
+        xaxis=dict(
+            range=list(x_range),
+            showgrid=True,
+            gridcolor='#e5e5e5',
+            title='Date',
+            title_font=dict(color='black', size=14),
+            tickfont=dict(color='black')
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='#e5e5e5',
+            title='Portfolio Value (₹)',
+            title_font=dict(color='black', size=14),
+            tickfont=dict(color='black'),
+            tickprefix='₹'
+        )
+    )
+    return kept, fig
+
+def highlight(fig, date, value):
+    """Move fig's highlight line and annotation to date, labelled with value."""
+    fig.layout.shapes[0].update(x0=date, x1=date)
+    fig.layout.annotations[0].update(x=date, y=value, text=f"₹{value:,.0f}")
+
+@st.fragment
+def portfolio_chart(start, end):
+    """
+    The Portfolio Performance chart with its visible-range and highlight
+    sliders. The data and base figure come from figure_cache, downsampled to
+    what the chart can show for the visible range, and moving either slider
+    reruns only this fragment: a new range draws a figure for it, a new
+    highlight moves the highlight and resends the chart.
+    """
+    began = time.perf_counter()
+    df = _portfolio_series(start, end)
+    dates = df['Date']
+    first_date, last_date = dates.iloc[0].to_pydatetime(), dates.iloc[-1].to_pydatetime()
+    x_range = st.slider("Visible range", first_date, last_date, (first_date, last_date),
+                        step=(dates.iloc[1] - dates.iloc[0]).to_pytimedelta(), format="MMM DD, YYYY")
+    kept, fig = figure_cache.session_figure(("portfolio", start, end, x_range), lambda: _portfolio_figure(df, x_range))
+    first, stop = downsample.visible(dates, x_range, pad=0)
+    if stop - first > 1:
+        idx = st.slider("Select Day to Highlight", first, stop-1, min(max(10, first), stop-1))
+    else:
+        idx = first
+    highlight(fig, dates.iloc[idx], df['Value'].iloc[idx])
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False}, key="portfolio-chart")
+    st.caption(f"{len(kept):,} points drawn for {stop - first:,} in range · "
+               f"chart updated in {(time.perf_counter() - began) * 1000:.1f} ms")
 
 def render():
     st.header("Financial Dashboard")
@@ -39,45 +132,7 @@ def render():
 
     # ✅ Portfolio Performance Chart (Updated Line Graph Section)
     st.subheader("Portfolio Performance")
-    df = generate_time_series("2024-01-01", "2024-03-14", 3200000, 5000)
-    idx = st.slider("Select Day to Highlight", 0, len(df)-1, 10)
-    sel_date = df.iloc[idx]['Date']
-    sel_val = df.iloc[idx]['Value']
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df['Date'], y=df['Value'],
-        mode='lines',
-        name='Portfolio Value',
-        line=dict(color='#3b82f6', width=2),
-        hovertemplate='Date: %{x|%b %d, %Y}<br>Value: ₹%{y:,.0f}<extra></extra>'
-    ))
-    fig.add_vline(x=sel_date, line_width=2, line_dash="dot", line_color="orange")
-    fig.add_annotation(
-        x=sel_date, y=sel_val,
-        text=f"₹{sel_val:,.0f}",
-        showarrow=True, arrowhead=1, ax=40, ay=-40
-    )
-    fig.update_layout(
-        plot_bgcolor='white', paper_bgcolor='white',
-        margin=dict(t=20, l=20, r=20, b=20),
-        xaxis=dict(
-            showgrid=True,
-            gridcolor='#e5e5e5',
-            title='Date',
-            title_font=dict(color='black', size=14),
-            tickfont=dict(color='black')
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='#e5e5e5',
-            title='Portfolio Value (₹)',
-            title_font=dict(color='black', size=14),
-            tickfont=dict(color='black'),
-            tickprefix='₹'
-        )
-    )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    portfolio_chart(*PORTFOLIO_RANGE)
 
     # ✅ Recent Activity - Stylish Table
     st.subheader("Recent Activity")
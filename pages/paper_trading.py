@@ -1,5 +1,6 @@
 import streamlit as st
-from utils import generate_time_series, generate_micro_chart
+import pandas as pd
+from holdings_grid import render_grid, render_actions
 
 def render():
     st.markdown("<div class='fade-in card'>", unsafe_allow_html=True)
@@ -26,27 +27,13 @@ def render():
         {"Name": "TCS", "Price": 3150, "Change": -1.2, "Low": 3100, "Quantity": 50},
         {"Name": "BTC", "Price": 2100000, "Change": 2.1, "Low": 2050000, "Quantity": 0.05}
     ]
-    st.write("**Name | Price | Price Change | 24h Low | Graph | Actions**")
-    st.write("---")
-    for row in holdings:
-        c1, c2, c3, c4, c5, c6 = st.columns([2,2,2,2,2,2])
-        with c1:
-            st.write(f"**{row['Name']}**")
-            st.write(f"Qty: {row['Quantity']}")
-        with c2:
-            st.write(f"₹{row['Price']}")
-        with c3:
-            color = "green" if row["Change"] >= 0 else "red"
-            st.markdown(f"<span style='color:{color};'>{row['Change']}%</span>", unsafe_allow_html=True)
-        with c4:
-            st.write(f"₹{row['Low']}")
-        with c5:
-            micro = generate_micro_chart()
-            st.plotly_chart(micro, use_container_width=True, config={"displayModeBar": False})
-        with c6:
-            st.write("**Trade**")
-            st.write("**Convert**")
-        st.markdown("---")
+    # One paginated grid for all positions, with a sparkline per row
+    selected = render_grid(pd.DataFrame(holdings), "paper", change_column="Change", column_config={
+        "Price": st.column_config.NumberColumn(format="₹%.2f"),
+        "Change": st.column_config.NumberColumn("Price Change", format="%.2f%%"),
+        "Low": st.column_config.NumberColumn("24h Low", format="₹%.2f"),
+    })
+    render_actions(selected, "paper")
     
     st.subheader("Transaction History")
     transactions = [
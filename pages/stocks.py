@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import silhouette_score
+from k_selection import select_k, STRATEGIES, SILHOUETTE
+from excel_cache import load_workbook, iter_sheets
+from memo import SharedMemo, file_signature
 import os
 
+# Clustered index results shared by every session, keyed by file signature and parameters
+index_memo = SharedMemo(maxsize=32, max_workers=4, thread_name_prefix="stocks-index")
+
 def extract_features(df):
     """
     Extract features from a DataFrame that contains:
@@ -46,51 +50,77 @@ def extract_features(df):
     }
     return features
 
-def process_index(file_path):
+def stream_features(file_path, on_sheet_error=None):
+    """
+    Build the per-stock features DataFrame while reading the workbook one sheet
+    (stock) at a time, so the combined workbook is never held in memory.
+    """
+    feature_data = []
+    for stock_symbol, stock_df in iter_sheets(file_path, on_sheet_error=on_sheet_error):
+        try:
+            feats = extract_features(stock_df)
+        except KeyError as e:
+            if on_sheet_error is not None:
+                on_sheet_error(stock_symbol, e)
+            continue
+        if feats:
+            feats['Stock'] = stock_symbol
+            feature_data.append(feats)
+    features_df = pd.DataFrame(feature_data)
+    return features_df.sort_values('Stock', kind='stable').reset_index(drop=True) if not features_df.empty else features_df
+
+def cluster_index(file_path, k_strategy=SILHOUETTE, patience=None, time_budget=None, streaming=False):
     """
     For a given index Excel file, this function:
       1. Reads and combines all sheets (each sheet represents a stock).
       2. Extracts features for each stock.
-      3. Normalizes the features and performs clustering.
+      3. Normalizes the features and performs clustering, choosing k with
+         k_strategy (see k_selection.STRATEGIES), optional early stopping
+         (patience) and a time budget in seconds.
       4. Maps clusters to uptrend groups.
       5. Selects up to 20 stocks per group.
-    Returns the final clustered DataFrame.
+    With streaming=True, steps 1-2 read one sheet at a time (see stream_features).
+    Makes no Streamlit calls so it can run on a worker thread. Returns a dict with
+    'final_clusters' (None on failure), the k 'selection' and the status
+    'messages' as (level, text) pairs for render_index_result.
     """
+    messages = []
+    result = {'final_clusters': None, 'selection': None, 'messages': messages}
     if not os.path.exists(file_path):
-        st.error(f"File not found: {file_path}")
-        return None
+        messages.append(("error", f"File not found: {file_path}"))
+        return result
 
-    try:
-        data = pd.ExcelFile(file_path)
-    except Exception as e:
-        st.error(f"Error reading Excel file {file_path}: {e}")
-        return None
-
-    # Combine all sheets into one DataFrame with a MultiIndex (Stock, Index)
-    all_data = {}
-    for sheet_name in data.sheet_names:
+    on_sheet_error = lambda sheet_name, e: messages.append(("error", f"Error reading sheet {sheet_name}: {e}"))
+    if streaming:
+        # Read one sheet at a time and keep only its feature row.
         try:
-            sheet_data = data.parse(sheet_name)
-            all_data[sheet_name] = sheet_data
+            features_df = stream_features(file_path, on_sheet_error=on_sheet_error)
         except Exception as e:
-            st.error(f"Error reading sheet {sheet_name}: {e}")
-    if not all_data:
-        st.error("No valid sheets found in file.")
-        return None
-
-    combined_data = pd.concat(all_data.values(), keys=all_data.keys(), names=["Stock", "Index"])
+            messages.append(("error", f"Error reading Excel file {file_path}: {e}"))
+            return result
+    else:
+        # Combine all sheets into one DataFrame with a MultiIndex (Stock, Index),
+        # served from the on-disk workbook cache when the file is unchanged.
+        try:
+            combined_data = load_workbook(file_path, names=["Stock", "Index"], on_sheet_error=on_sheet_error)
+        except Exception as e:
+            messages.append(("error", f"Error reading Excel file {file_path}: {e}"))
+            return result
+        if combined_data is None:
+            messages.append(("error", "No valid sheets found in file."))
+            return result
 
-    # Build a features DataFrame, one row per stock.
-    feature_data = []
-    for stock_symbol, stock_df in combined_data.groupby(level=0):
-        feats = extract_features(stock_df)
-        if feats:
-            feats['Stock'] = stock_symbol
-            feature_data.append(feats)
-    features_df = pd.DataFrame(feature_data)
+        # Build a features DataFrame, one row per stock.
+        feature_data = []
+        for stock_symbol, stock_df in combined_data.groupby(level=0):
+            feats = extract_features(stock_df)
+            if feats:
+                feats['Stock'] = stock_symbol
+                feature_data.append(feats)
+        features_df = pd.DataFrame(feature_data)
     if features_df.empty:
-        st.error("No valid stock data found in file.")
-        return None
+        messages.append(("error", "No valid stock data found in file."))
+        return result
 
     # Define final features and normalize them.
     final_feature_cols = [
@@ -105,30 +135,22 @@ def process_index(file_path):
     scaler = StandardScaler()
     X = scaler.fit_transform(features_df[final_feature_cols])
 
-    # Clustering using silhouette score to select the best k.
+    # Clustering: pick the best k with the selected k-selection strategy.
     if X.shape[0] < 2:
-        st.warning("Only one sample available for clustering. Skipping clustering step.")
+        messages.append(("warning", "Only one sample available for clustering. Skipping clustering step."))
         features_df['Cluster'] = 0
     else:
-        best_k = None
-        best_score = -1
-        best_kmeans = None
-        for k in range(2, 11):
-            kmeans = KMeans(n_clusters=k, random_state=42)
-            labels = kmeans.fit_predict(X)
-            score = silhouette_score(X, labels)
-            if score > best_score:
-                best_score = score
-                best_k = k
-                best_kmeans = kmeans
-
-        if best_kmeans is None:
-            st.error("Clustering failed.")
-            return None
-
-        if best_score >= 0.95:
-            st.success(f"Selected k={best_k} with a silhouette score of {best_score:.4f} (>= 0.95).")
-        features_df['Cluster'] = best_kmeans.labels_
+        try:
+            selection = select_k(X, strategy=k_strategy, patience=patience, time_budget=time_budget)
+        except (ValueError, TimeoutError) as e:
+            messages.append(("error", f"Clustering failed: {e}"))
+            return result
+
+        best_k, best_score = selection['k'], selection['score']
+        if k_strategy == SILHOUETTE and best_score >= 0.95:
+            messages.append(("success", f"Selected k={best_k} with a silhouette score of {best_score:.4f} (>= 0.95)."))
+        result['selection'] = selection
+        features_df['Cluster'] = selection['labels']
 
     # Map clusters to uptrend groups (e.g., 95%, 90%, 80% Uptrend)
     avg_change = features_df.groupby('Cluster')['price_change'].mean().sort_values(ascending=False)
@@ -155,7 +177,39 @@ def process_index(file_path):
         .apply(pick_top_20)
         .reset_index(drop=True)
     )
-    return final_clusters
+    result['final_clusters'] = final_clusters
+    return result
+
+def render_index_result(result):
+    """Show the status messages and k-selection details produced by cluster_index."""
+    for level, text in result['messages']:
+        getattr(st, level)(text)
+    selection = result['selection']
+    if selection is not None:
+        with st.expander(f"k selection: k={selection['k']} ({selection['strategy']}, {selection['elapsed_seconds']:.2f}s)"):
+            if selection['stopped_early']:
+                st.write("Stopped early (no improvement or time budget reached).")
+            st.dataframe(selection['timings'])
+
+def process_index(file_path, k_strategy=SILHOUETTE, patience=None, time_budget=None, streaming=False):
+    """
+    Cluster one index workbook (see cluster_index), show its status messages
+    and return the final clustered DataFrame.
+    """
+    result = cluster_index(file_path, k_strategy=k_strategy, patience=patience, time_budget=time_budget, streaming=streaming)
+    render_index_result(result)
+    return result['final_clusters']
+
+def submit_index(file_path, k_strategy=SILHOUETTE, patience=None, time_budget=None, streaming=False):
+    """
+    Start (or reuse) the clustering of one index on the shared memo. The key is the
+    workbook's signature plus the clustering parameters, so every session and rerun
+    reuses the result until the file or parameters change.
+    """
+    signature = file_signature(file_path) if os.path.exists(file_path) else (os.path.abspath(file_path), None, None)
+    key = (signature, k_strategy, patience, time_budget, streaming)
+    return index_memo.submit(key, cluster_index, file_path, k_strategy=k_strategy, patience=patience,
+                             time_budget=time_budget, streaming=streaming)
 
 def show_page():
     st.title("Stock Clustering - Uptrend Probability")
@@ -168,18 +222,34 @@ def show_page():
         "Nifty Midcap 100": "Nifty_Midcap_100.xlsx",
     }
 
+    with st.sidebar:
+        st.header("Clustering")
+        k_strategy = st.selectbox("k selection strategy", STRATEGIES, index=STRATEGIES.index(SILHOUETTE))
+        patience = st.number_input("Early stop after k without improvement (0 = off)", min_value=0, value=0)
+        time_budget = st.number_input("Time budget per index (seconds, 0 = none)", min_value=0.0, value=0.0)
+        streaming = st.checkbox("Stream workbooks sheet by sheet (low memory)", value=False)
+
     st.write("Processing clustering for the following indices:")
     for index_name in data_files.keys():
         st.write(f"- {index_name}")
 
+    # Start every index up front so they are computed concurrently; each tab then
+    # waits only for its own result, which is immediate once memoized.
+    futures = {
+        index_name: submit_index(file_path, k_strategy=k_strategy, patience=patience or None,
+                                 time_budget=time_budget or None, streaming=streaming)
+        for index_name, file_path in data_files.items()
+    }
+
     # Create tabs for each index.
     tabs = st.tabs(list(data_files.keys()))
     for idx, index_name in enumerate(data_files.keys()):
         with tabs[idx]:
             st.header(index_name)
-            file_path = data_files[index_name]
             with st.spinner(f"Processing {index_name}..."):
-                final_clusters = process_index(file_path)
+                result = futures[index_name].result()
+            render_index_result(result)
+            final_clusters = result['final_clusters']
             if final_clusters is not None:
                 st.subheader("Clustered Stocks")
                 st.dataframe(final_clusters)
@@ -1,7 +1,15 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
-from utils import generate_micro_chart
+from holdings_grid import render_grid, render_actions
+
+# Display formats shared by both holdings grids
+COLUMN_CONFIG = {
+    "Price (₹)": st.column_config.NumberColumn(format="₹%.2f"),
+    "Price Change (%)": st.column_config.NumberColumn(format="%.2f%%"),
+    "24h Low (₹)": st.column_config.NumberColumn(format="₹%.2f"),
+    "Total Value (₹)": st.column_config.NumberColumn(format="₹%.2f"),
+}
 
 def render():
     st.header("Your Holdings (Professional Layout)")
@@ -19,43 +27,10 @@ def render():
     })
     df_stocks["Total Value (₹)"] = df_stocks["Price (₹)"] * df_stocks["Quantity"]
 
-    # Create header row for Stocks table
-    stocks_header = st.columns([2, 2, 2, 2, 2, 2])
-    stocks_header[0].markdown("**Stock Name**")
-    stocks_header[1].markdown("**Price (₹)**")
-    stocks_header[2].markdown("**Price Change (%)**")
-    stocks_header[3].markdown("**24h Low (₹)**")
-    stocks_header[4].markdown("**Graph**")
-    stocks_header[5].markdown("**Actions**")
-    st.markdown("---")
-
-    # Render each row for stocks
-    for _, row in df_stocks.iterrows():
-        cols = st.columns([2, 2, 2, 2, 2, 2])
-        with cols[0]:
-            st.write(f"{row['Name']}")
-            st.write(f"Qty: {row['Quantity']}")
-        with cols[1]:
-            st.write(f"₹{row['Price (₹)']}")
-        # Color-code the price change
-        color = "green" if row["Price Change (%)"] >= 0 else "red"
-        with cols[2]:
-            st.markdown(f"<span style='color:{color};'>{row['Price Change (%)']}%</span>", unsafe_allow_html=True)
-        with cols[3]:
-            st.write(f"₹{row['24h Low (₹)']}")
-        with cols[4]:
-            micro = generate_micro_chart()
-            st.plotly_chart(micro, use_container_width=True, config={"displayModeBar": False})
-        with cols[5]:
-            st.markdown(
-                "<button style='background:#3b82f6;color:white;padding:5px 10px;border:none;border-radius:5px;'>Trade</button>",
-                unsafe_allow_html=True,
-            )
-            st.markdown(
-                "<button style='background:#10b981;color:white;padding:5px 10px;border:none;border-radius:5px;'>Convert</button>",
-                unsafe_allow_html=True,
-            )
-        st.markdown("---")
+    # One paginated grid for all positions, with a sparkline per row
+    selected = render_grid(df_stocks, "stocks", change_column="Price Change (%)",
+                           column_config={**COLUMN_CONFIG, "Name": st.column_config.TextColumn("Stock Name")})
+    render_actions(selected, "stocks")
 
     # Stocks Total Value Chart with updated labels and colors
     st.write("### Stocks Total Value")
@@ -98,43 +73,10 @@ def render():
     })
     df_crypto["Total Value (₹)"] = df_crypto["Price (₹)"] * df_crypto["Quantity"]
 
-    # Create header row for Crypto table
-    crypto_header = st.columns([2, 2, 2, 2, 2, 2])
-    crypto_header[0].markdown("**Crypto Name**")
-    crypto_header[1].markdown("**Price (₹)**")
-    crypto_header[2].markdown("**Price Change (%)**")
-    crypto_header[3].markdown("**24h Low (₹)**")
-    crypto_header[4].markdown("**Graph**")
-    crypto_header[5].markdown("**Actions**")
-    st.markdown("---")
-
-    # Render each row for crypto
-    for _, row in df_crypto.iterrows():
-        cols = st.columns([2, 2, 2, 2, 2, 2])
-        with cols[0]:
-            st.write(f"{row['Name']}")
-            st.write(f"Qty: {row['Quantity']}")
-        with cols[1]:
-            st.write(f"₹{row['Price (₹)']}")
-        # Color-code the price change
-        color = "green" if row["Price Change (%)"] >= 0 else "red"
-        with cols[2]:
-            st.markdown(f"<span style='color:{color};'>{row['Price Change (%)']}%</span>", unsafe_allow_html=True)
-        with cols[3]:
-            st.write(f"₹{row['24h Low (₹)']}")
-        with cols[4]:
-            micro = generate_micro_chart()
-            st.plotly_chart(micro, use_container_width=True, config={"displayModeBar": False})
-        with cols[5]:
-            st.markdown(
-                "<button style='background:#3b82f6;color:white;padding:5px 10px;border:none;border-radius:5px;'>Trade</button>",
-                unsafe_allow_html=True,
-            )
-            st.markdown(
-                "<button style='background:#10b981;color:white;padding:5px 10px;border:none;border-radius:5px;'>Convert</button>",
-                unsafe_allow_html=True,
-            )
-        st.markdown("---")
+    # One paginated grid for all positions, with a sparkline per row
+    selected = render_grid(df_crypto, "crypto", change_column="Price Change (%)",
+                           column_config={**COLUMN_CONFIG, "Name": st.column_config.TextColumn("Crypto Name")})
+    render_actions(selected, "crypto")
 
     # Crypto Total Value Chart with updated labels and colors
     st.write("### Crypto Total Value")
@@ -0,0 +1,158 @@
+import os
+import json
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from filelock import FileLock
+
+# Root directory of the partitioned prediction store
+STORE_DIR = "predictions_store"
+MANIFEST_NAME = "manifest.json"
+
+# ============
+# MANIFEST
+# ============
+
+def _manifest_path(store_dir):
+    return os.path.join(store_dir, MANIFEST_NAME)
+
+def _lock(store_dir):
+    os.makedirs(store_dir, exist_ok=True)
+    return FileLock(os.path.join(store_dir, MANIFEST_NAME + ".lock"))
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def read_manifest(store_dir=STORE_DIR):
+    """
+    Return the store manifest: one entry per Parquet part with its partition,
+    row count, min/max prediction date and the coins it contains.
+    """
+    try:
+        with open(_manifest_path(store_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": 1, "parts": [], "migrated": []}
+
+def _write_manifest(store_dir, manifest):
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=1)
+    _write_atomic(_manifest_path(store_dir), write)
+
+def store_exists(store_dir=STORE_DIR):
+    return os.path.exists(_manifest_path(store_dir))
+
+# ============
+# WRITES
+# ============
+
+def _write_parts(prediction_df, store_dir):
+    """Write one Parquet part per prediction day and return their manifest entries."""
+    entries = []
+    for day, day_df in prediction_df.groupby(prediction_df["date"].dt.strftime("%Y-%m-%d")):
+        rel_path = os.path.join(f"date={day}", f"part-{uuid.uuid4().hex}.parquet")
+        path = os.path.join(store_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(day_df.reset_index(drop=True), preserve_index=False)
+        _write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path))
+        entries.append({
+            "path": rel_path,
+            "partition": day,
+            "rows": len(day_df),
+            "min_date": day_df["date"].min().isoformat(),
+            "max_date": day_df["date"].max().isoformat(),
+            "coins": sorted(day_df["Coin"].astype(str).unique().tolist()) if "Coin" in day_df.columns else [],
+        })
+    return entries
+
+def append_predictions(prediction_df, store_dir=STORE_DIR):
+    """
+    Append prediction rows to the store. Rows are partitioned by the day of
+    their 'date' column. Each part is written to a unique file and renamed into
+    place before the manifest is updated under a file lock, so concurrent
+    sessions never see a partial append or lose each other's parts.
+    """
+    prediction_df = prediction_df.copy()
+    prediction_df["date"] = pd.to_datetime(prediction_df["date"])
+    entries = _write_parts(prediction_df, store_dir)
+    with _lock(store_dir):
+        manifest = read_manifest(store_dir)
+        manifest["parts"].extend(entries)
+        _write_manifest(store_dir, manifest)
+    return len(prediction_df)
+
+# ============
+# READS
+# ============
+
+def read_predictions(store_dir=STORE_DIR, since=None, until=None, coins=None, columns=None):
+    """
+    Read predictions whose 'date' lies in [since, until], optionally restricted
+    to some coins. Parts are pruned on the manifest's date range and coin list,
+    so only the partitions that can match are opened.
+    """
+    since = pd.Timestamp(since) if since is not None else None
+    until = pd.Timestamp(until) if until is not None else None
+    coins = {str(c) for c in coins} if coins is not None else None
+
+    frames = []
+    for part in read_manifest(store_dir)["parts"]:
+        if since is not None and pd.Timestamp(part["max_date"]) < since:
+            continue
+        if until is not None and pd.Timestamp(part["min_date"]) > until:
+            continue
+        if coins is not None and coins.isdisjoint(part["coins"]):
+            continue
+        part_df = pq.read_table(os.path.join(store_dir, part["path"]), columns=columns).to_pandas()
+        frames.append(part_df)
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    predictions = pd.concat(frames, ignore_index=True)
+
+    mask = pd.Series(True, index=predictions.index)
+    if since is not None:
+        mask &= predictions["date"] >= since
+    if until is not None:
+        mask &= predictions["date"] <= until
+    if coins is not None:
+        mask &= predictions["Coin"].astype(str).isin(coins)
+    return predictions[mask].reset_index(drop=True)
+
+# ============
+# MIGRATION
+# ============
+
+def _migrated(manifest, source):
+    return any(m["source"] == source for m in manifest["migrated"])
+
+def migrate_csv(csv_path, store_dir=STORE_DIR):
+    """
+    One-shot import of a flat predictions_log.csv into the store. The CSV's
+    path is recorded in the manifest once imported, so later calls return
+    without reading the file, even if it has since been edited. Returns the
+    number of rows imported.
+    """
+    source = os.path.abspath(csv_path)
+    if _migrated(read_manifest(store_dir), source):
+        return 0
+
+    with _lock(store_dir):
+        manifest = read_manifest(store_dir)
+        if _migrated(manifest, source):
+            return 0
+        predictions_log = pd.read_csv(csv_path)
+        predictions_log["date"] = pd.to_datetime(predictions_log["date"])
+        entries = _write_parts(predictions_log, store_dir) if not predictions_log.empty else []
+        manifest["parts"].extend(entries)
+        manifest["migrated"].append({"source": source})
+        _write_manifest(store_dir, manifest)
+    return len(predictions_log)
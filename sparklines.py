@@ -0,0 +1,38 @@
+import zlib
+import threading
+import numpy as np
+from cachetools import LRUCache
+from utils import micro_chart_values
+
+# Points per sparkline: hourly over the last 24 hours, as in generate_micro_chart
+WINDOW = 25
+
+# Sparkline series kept, keyed by (symbol, window)
+CACHE_SIZE = 4096
+
+_cache = LRUCache(maxsize=CACHE_SIZE)
+_lock = threading.Lock()
+_counts = {"hits": 0, "misses": 0}
+
+def _seed(symbol, window):
+    # Stable across processes, unlike hash()
+    return zlib.crc32(f"{symbol}:{window}".encode("utf-8"))
+
+def _cached(key, build):
+    with _lock:
+        value = _cache.get(key)
+        _counts["hits" if value is not None else "misses"] += 1
+    if value is None:
+        value = build()
+        with _lock:
+            _cache[key] = value
+    return value
+
+def series(symbol, window=WINDOW):
+    """symbol's sparkline values over window points, as a list for LineChartColumn, drawn once per (symbol, window)."""
+    return _cached((symbol, window),
+                   lambda: np.round(micro_chart_values(window, seed=_seed(symbol, window)), 2).tolist())
+
+def stats():
+    with _lock:
+        return {'cached': len(_cache), **_counts}
@@ -0,0 +1,195 @@
+import os
+import json
+import shutil
+import sqlite3
+import threading
+from collections.abc import Mapping
+from urllib.parse import quote
+from langchain_core.documents import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+
+# Largest number of SQL parameters bound in one statement
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, page_content TEXT NOT NULL, metadata TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS positions (position INTEGER PRIMARY KEY, id TEXT NOT NULL);
+"""
+
+def _batches(items):
+    items = list(items)
+    for start in range(0, len(items), _BATCH):
+        yield items[start:start + _BATCH]
+
+def _document(page_content, metadata):
+    return Document(page_content=page_content, metadata=json.loads(metadata))
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    LangChain docstore kept in an SQLite file instead of a pickled dict.
+
+    Chunk text and metadata (as JSON) stay on disk and are read per lookup, so
+    opening a store costs the same at any corpus size and only the hits of a
+    query are ever turned into Documents. The positions table records which
+    FAISS row holds which id; it is written by save() and read through
+    positions().
+
+    readonly=True opens a published, never-modified file without locking; the
+    connection stays open, so the store remains readable after its file is
+    pruned. Otherwise the file is a private working copy.
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1",
+                                         uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            # A working copy is discarded if anything fails, so skip the journal
+            self._conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + _SCHEMA)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def copy(cls, source_path, path):
+        """A writable working copy of a published docstore file."""
+        shutil.copyfile(source_path, path)
+        return cls(path)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def search(self, search):
+        with self._lock:
+            row = self._conn.execute("SELECT page_content, metadata FROM docs WHERE id = ?", (search,)).fetchone()
+        return _document(*row) if row is not None else f"ID {search} not found."
+
+    def mget(self, ids):
+        """Documents for ids, in order (None for unknown ids), in one query per batch."""
+        found = {}
+        with self._lock:
+            for batch in _batches(dict.fromkeys(ids)):
+                found.update((doc_id, _document(text, metadata)) for doc_id, text, metadata in self._conn.execute(
+                    f"SELECT id, page_content, metadata FROM docs WHERE id IN ({','.join('?' * len(batch))})", batch))
+        return [found.get(doc_id) for doc_id in ids]
+
+    def iter_documents(self):
+        """(id, Document) for every stored chunk, streamed from disk."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT id, page_content, metadata FROM docs")
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(_BATCH)
+            if not rows:
+                return
+            for doc_id, text, metadata in rows:
+                yield doc_id, _document(text, metadata)
+
+    def count_by(self, field):
+        """{value: chunk count} for a metadata field, counted in SQLite without reading any chunk text."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT json_extract(metadata, '$.' || ?), COUNT(*) FROM docs GROUP BY 1", (field,)).fetchall())
+
+    def group_by(self, field, value):
+        """{field value: a value of another metadata field among its chunks}, grouped in SQLite without reading any chunk text."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT json_extract(metadata, '$.' || ?), MAX(json_extract(metadata, '$.' || ?)) FROM docs GROUP BY 1",
+                (field, value)).fetchall())
+
+    def add(self, texts):
+        rows = [(doc_id, doc.page_content, json.dumps(doc.metadata, default=str)) for doc_id, doc in texts.items()]
+        with self._lock, self._conn:
+            try:
+                self._conn.executemany("INSERT INTO docs (id, page_content, metadata) VALUES (?, ?, ?)", rows)
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Tried to add ids that already exist: {set(texts)}") from None
+
+    def delete(self, ids):
+        with self._lock, self._conn:
+            deleted = sum(self._conn.execute(f"DELETE FROM docs WHERE id IN ({','.join('?' * len(batch))})", batch).rowcount
+                          for batch in _batches(ids))
+        if not deleted:
+            raise ValueError(f"Tried to delete ids that does not  exist: {ids}")
+
+    def update_metadata(self, ids, **fields):
+        """Set metadata fields on the given ids in place."""
+        with self._lock, self._conn:
+            for batch in _batches(ids):
+                rows = self._conn.execute(
+                    f"SELECT id, metadata FROM docs WHERE id IN ({','.join('?' * len(batch))})", batch).fetchall()
+                self._conn.executemany("UPDATE docs SET metadata = ? WHERE id = ?",
+                                       [(json.dumps({**json.loads(metadata), **fields}, default=str), doc_id)
+                                        for doc_id, metadata in rows])
+
+    def positions(self):
+        """The FAISS row -> id mapping recorded by save(), read lazily."""
+        return _Positions(self)
+
+    def save(self, path, index_to_docstore_id):
+        """
+        Write a compact, self-contained copy to path with the given FAISS row -> id
+        mapping, ready to be opened with readonly=True.
+        """
+        target = sqlite3.connect(path)
+        try:
+            with self._lock:
+                self._conn.backup(target)
+            with target:
+                target.execute("DELETE FROM positions")
+                target.executemany("INSERT INTO positions (position, id) VALUES (?, ?)",
+                                   ((int(position), doc_id) for position, doc_id in index_to_docstore_id.items()))
+            target.execute("PRAGMA journal_mode=DELETE")
+            free, pages = target.execute("PRAGMA freelist_count").fetchone()[0], target.execute("PRAGMA page_count").fetchone()[0]
+            if free * 4 > pages:
+                target.execute("VACUUM")
+        finally:
+            target.close()
+
+    @classmethod
+    def create(cls, path, documents, index_to_docstore_id):
+        """Write documents ({id: Document}) and the row -> id mapping as a new docstore file at path."""
+        store = cls(path)
+        try:
+            store.add(documents)
+            with store._conn:
+                store._conn.executemany("INSERT INTO positions (position, id) VALUES (?, ?)",
+                                        ((int(position), doc_id) for position, doc_id in index_to_docstore_id.items()))
+            store._conn.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            store.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class _Positions(Mapping):
+    """Read-only FAISS row -> docstore id mapping backed by the positions table."""
+
+    def __init__(self, docstore):
+        self._docstore = docstore
+        with docstore._lock:
+            self._len = docstore._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def __getitem__(self, position):
+        with self._docstore._lock:
+            row = self._docstore._conn.execute("SELECT id FROM positions WHERE position = ?", (int(position),)).fetchone()
+        if row is None:
+            raise KeyError(position)
+        return row[0]
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(position for position, _ in self.items())
+
+    def items(self):
+        with self._docstore._lock:
+            return self._docstore._conn.execute("SELECT position, id FROM positions ORDER BY position").fetchall()
+
+    def values(self):
+        return [doc_id for _, doc_id in self.items()]
@@ -3,16 +3,57 @@ import numpy as np
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 
-def generate_time_series(start_date, end_date, base, trend_factor, noise=0.05):
+# Time-series models for generate_series
+TREND = "trend"              # base + linear trend + quadratic drift + Gaussian noise
+NOISE = "noise"              # base + Gaussian noise
+RANDOM_WALK = "random_walk"  # base + cumulative Gaussian steps
+MODELS = (TREND, NOISE, RANDOM_WALK)
+
+# Quadratic drift of the trend model, per day squared
+QUADRATIC_DRIFT = 0.1
+
+def generate_series(n_series, n_days, base=100.0, trend_factor=0.0, noise=0.05, model=TREND, seed=None, dtype=np.float64):
+    """
+    (n_series, n_days) array of synthetic series, drawn in one call from a Generator.
+
+    base, trend_factor and noise are scalars or one value per series; noise is
+    the standard deviation of each shock (each step for RANDOM_WALK) as a
+    fraction of base. seed is an int, a Generator or None for fresh entropy.
+    dtype=np.float32 draws and computes in float32, so its values are not the
+    float64 ones rounded.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}")
+    rng = np.random.default_rng(seed)
+    dtype = np.dtype(dtype)
+    base = np.asarray(base, dtype=dtype).reshape(-1, 1)
+    scale = np.asarray(noise, dtype=dtype).reshape(-1, 1) * base
+    values = rng.standard_normal((n_series, n_days), dtype=dtype)
+    if model == RANDOM_WALK:
+        np.cumsum(values, axis=1, out=values)
+    values *= scale
+    values += base
+    if model == TREND:
+        days = np.arange(n_days, dtype=dtype)
+        values += np.asarray(trend_factor, dtype=dtype).reshape(-1, 1) * days + days ** 2 * dtype.type(QUADRATIC_DRIFT)
+    return values
+
+def generate_time_series(start_date, end_date, base, trend_factor, noise=0.05, seed=None):
     dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    values = [base + (i * trend_factor) + (i**2 * 0.1) + np.random.randn()*noise*base for i in range(len(dates))]
+    values = generate_series(1, len(dates), base, trend_factor, noise, seed=seed)[0]
     return pd.DataFrame({'Date': dates, 'Value': values})
 
-def generate_micro_chart():
+def micro_chart_values(n_points, seed=None):
+    """Random walk with unit steps from a random base between 100 and 1000, as drawn by generate_micro_chart."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(100, 1000)
+    # Unit steps, as noise is relative to base
+    return generate_series(1, n_points, base, noise=1 / base, model=RANDOM_WALK, seed=rng)[0]
+
+def generate_micro_chart(seed=None):
     now = datetime.now()
-    times = pd.date_range(start=now - timedelta(hours=24), end=now, freq='H')
-    base = np.random.uniform(100, 1000)
-    values = np.cumsum(np.random.randn(len(times))) + base
+    times = pd.date_range(start=now - timedelta(hours=24), end=now, freq='h')
+    values = micro_chart_values(len(times), seed)
     df = pd.DataFrame({'Time': times, 'Value': values})
     up = values[-1] >= values[0]
     color = "#00c853" if up else "#d50000"
@@ -0,0 +1,434 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+import faiss
+from filelock import FileLock
+from langchain_community.vectorstores import FAISS
+import ann_index
+from answer_stream import tag_answer_step
+from sqlite_docstore import SQLiteDocstore
+
+# Directory holding the published index versions
+INDEX_DIR = "vectorIndex_mistral"
+
+# Pointer file naming the version readers should load
+CURRENT_FILE = "CURRENT"
+
+# Files of a published version: the faiss index and its SQLite docstore
+FAISS_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.db"
+
+# Published versions kept on disk: the newest plus the one before it, so a
+# reader that picked up the old pointer can still finish loading it
+KEEP_VERSIONS = 2
+
+# Rebuild the index once vectors deleted since the last compaction exceed this
+# fraction of the live ones
+COMPACT_RATIO = 0.25
+
+class IndexHandle:
+    """A loaded index version with its retriever and QA chain, shared by every reader."""
+
+    def __init__(self, version, vectorstore):
+        self.version = version
+        self.vectorstore = vectorstore
+        self.retriever = vectorstore.as_retriever()
+        self._chain = None
+        self._chain_llm = None
+        self._sources = None
+        self._doc_hashes = None
+        self._lock = threading.Lock()
+
+    def chain(self, llm):
+        """RetrievalQAWithSourcesChain over this version, built once per LLM, with its answer step tagged for streaming."""
+        # Imported here: langchain.chains pulls in transformers, seconds the page import should not pay
+        from langchain.chains import RetrievalQAWithSourcesChain
+        with self._lock:
+            if self._chain is None or self._chain_llm is not llm:
+                self._chain = tag_answer_step(RetrievalQAWithSourcesChain.from_llm(llm=llm, retriever=self.retriever))
+                self._chain_llm = llm
+            return self._chain
+
+    @property
+    def kind(self):
+        return ann_index.index_kind(self.vectorstore.index)
+
+    def sources(self):
+        """Indexed source URLs mapped to their chunk counts, computed once per version."""
+        with self._lock:
+            if self._sources is None:
+                if isinstance(self.vectorstore.docstore, SQLiteDocstore):
+                    self._sources = self.vectorstore.docstore.count_by("source")
+                else:
+                    self._sources = {url: sum(len(ids) for ids in entry["chunks"].values())
+                                     for url, entry in _sources(self.vectorstore).items()}
+            return self._sources
+
+    def doc_hashes(self):
+        """Indexed source URLs mapped to the hash of the article text they were indexed from, computed once per version."""
+        with self._lock:
+            if self._doc_hashes is None:
+                if isinstance(self.vectorstore.docstore, SQLiteDocstore):
+                    self._doc_hashes = self.vectorstore.docstore.group_by("source", "doc_hash")
+                else:
+                    self._doc_hashes = {url: entry["doc_hash"] for url, entry in _sources(self.vectorstore).items()}
+            return self._doc_hashes
+
+    def unchanged(self, document):
+        """Whether document's text is what this version indexed for its source URL, so update_documents would skip it."""
+        return self.doc_hashes().get(document.metadata.get("source")) == _hash_text(document.page_content)
+
+_resident = {}
+_load_lock = threading.Lock()
+
+def _key(index_dir):
+    return os.path.abspath(index_dir)
+
+def _read_pointer(index_dir):
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE)) as f:
+            current = json.load(f)
+        current["version"], current["path"]
+        return current
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _read_current(index_dir):
+    """(version, path) of the published index, or None. A bare index from before versioning counts as one version."""
+    current = _read_pointer(index_dir)
+    if current is not None:
+        return current["version"], os.path.join(index_dir, current["path"])
+    legacy_file = os.path.join(index_dir, "index.faiss")
+    if os.path.exists(legacy_file):
+        return f"legacy-{os.stat(legacy_file).st_mtime_ns}", index_dir
+    return None
+
+def current_version(index_dir=INDEX_DIR):
+    """Version stamp of the published index, or None if nothing has been published."""
+    current = _read_current(index_dir)
+    return current[0] if current is not None else None
+
+def exists(index_dir=INDEX_DIR):
+    return _read_current(index_dir) is not None
+
+def _install(index_dir, handle):
+    with _load_lock:
+        resident = _resident.get(_key(index_dir))
+        # Never replace a newer version with an older one
+        if resident is None or resident.version < handle.version or resident.version.startswith("legacy-"):
+            _resident[_key(index_dir)] = handle
+
+def _prune(index_dir, keep):
+    """
+    Remove all but the newest `keep` version directories. A bare pre-versioning
+    index is left alone: publish did not create it, and once CURRENT exists it
+    is no longer read.
+    """
+    versions = sorted(name for name in os.listdir(index_dir)
+                      if name.startswith("v") and os.path.isdir(os.path.join(index_dir, name)))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+def _save(vectorstore, path):
+    """Write vectorstore to a new version directory as a faiss index plus an SQLite docstore."""
+    os.makedirs(path)
+    faiss.write_index(vectorstore.index, os.path.join(path, FAISS_FILE))
+    docstore_path = os.path.join(path, DOCSTORE_FILE)
+    if isinstance(vectorstore.docstore, SQLiteDocstore):
+        vectorstore.docstore.save(docstore_path, vectorstore.index_to_docstore_id)
+    else:
+        documents = {doc_id: vectorstore.docstore.search(doc_id) for doc_id in vectorstore.index_to_docstore_id.values()}
+        SQLiteDocstore.create(docstore_path, documents, vectorstore.index_to_docstore_id)
+
+def _is_pickled(path):
+    return not os.path.exists(os.path.join(path, DOCSTORE_FILE))
+
+def _open(path, embeddings, index=None):
+    """
+    Load a published version. Chunk text stays in the SQLite docstore and only
+    query hits are read from it; versions saved before it existed are unpickled.
+    """
+    if _is_pickled(path):
+        return FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    if index is None:
+        index = faiss.read_index(os.path.join(path, FAISS_FILE))
+    docstore = SQLiteDocstore(os.path.join(path, DOCSTORE_FILE), readonly=True)
+    return FAISS(embeddings, index, docstore, docstore.positions())
+
+def publish(vectorstore, index_dir=INDEX_DIR, deleted_since_compaction=0, search_params=None):
+    """
+    Save vectorstore as a new index version and make it the one readers load.
+
+    The version is written to its own directory first and then made current by
+    atomically replacing the CURRENT pointer, so readers only ever see a complete
+    index. The store is also installed as the resident handle of this process,
+    so the next query here does not reload it; vectorstore must not be modified
+    afterwards. search_params (nprobe, ef_search) are recorded for readers to
+    apply after loading. Returns the new version stamp.
+    """
+    version = f"{time.time_ns():020d}"
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, f"v{version}")
+    _save(vectorstore, path)
+
+    pointer = os.path.join(index_dir, CURRENT_FILE)
+    tmp_pointer = f"{pointer}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_pointer, "w") as f:
+        json.dump({"version": version, "path": f"v{version}",
+                   "deleted_since_compaction": deleted_since_compaction,
+                   "search": search_params or {}}, f)
+    os.replace(tmp_pointer, pointer)
+
+    _install(index_dir, IndexHandle(version, _open(path, vectorstore.embedding_function, index=vectorstore.index)))
+    _prune(index_dir, KEEP_VERSIONS)
+    return version
+
+def get_index(embeddings, index_dir=INDEX_DIR):
+    """
+    Return the resident IndexHandle for the published index, or None if there is none.
+
+    The index is deserialized only when its version stamp differs from the resident
+    one; otherwise this costs one read of the small pointer file. Handles are never
+    mutated, so a reader keeps searching the version it got while a rebuild swaps
+    in the next one. Nothing on disk is written here: a version with a pickled
+    docstore is served as it is until the next update or compaction publishes
+    it again with an SQLite one.
+    """
+    current = _read_current(index_dir)
+    if current is None:
+        return None
+    version, path = current
+    handle = _resident.get(_key(index_dir))
+    if handle is not None and handle.version == version:
+        return handle
+
+    with _load_lock:
+        handle = _resident.get(_key(index_dir))
+        if handle is not None and handle.version == version:
+            return handle
+        try:
+            vectorstore = _open(path, embeddings)
+        except (OSError, RuntimeError, sqlite3.Error):
+            # Pruned by a concurrent publish: load whatever is current now
+            current = _read_current(index_dir)
+            if current is None:
+                return None
+            version, path = current
+            vectorstore = _open(path, embeddings)
+        ann_index.set_search_params(vectorstore.index, **(_read_pointer(index_dir) or {}).get("search", {}))
+        handle = IndexHandle(version, vectorstore)
+        _resident[_key(index_dir)] = handle
+    return handle
+
+# ============
+# INCREMENTAL UPDATES
+# ============
+
+def _hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _lock(index_dir):
+    os.makedirs(index_dir, exist_ok=True)
+    return FileLock(os.path.join(index_dir, CURRENT_FILE + ".lock"))
+
+@contextmanager
+def _private(embeddings, index_dir):
+    """
+    Yield (vectorstore, docstore): a copy of the published store that can be
+    mutated without affecting readers (None if nothing is published yet) and
+    its writable SQLite docstore, a scratch file removed on exit.
+    """
+    scratch = os.path.join(index_dir, f".work-{uuid.uuid4().hex}.db")
+    current = _read_current(index_dir)
+    docstore = None
+    try:
+        if current is None:
+            vectorstore, docstore = None, SQLiteDocstore(scratch)
+        elif not _is_pickled(current[1]):
+            docstore = SQLiteDocstore.copy(os.path.join(current[1], DOCSTORE_FILE), scratch)
+            vectorstore = FAISS(embeddings, faiss.read_index(os.path.join(current[1], FAISS_FILE)),
+                                docstore, dict(docstore.positions().items()))
+        else:
+            pickled = FAISS.load_local(current[1], embeddings, allow_dangerous_deserialization=True)
+            docstore = SQLiteDocstore(scratch)
+            docstore.add({doc_id: pickled.docstore.search(doc_id) for doc_id in pickled.index_to_docstore_id.values()})
+            vectorstore = FAISS(embeddings, pickled.index, docstore, dict(pickled.index_to_docstore_id))
+        yield vectorstore, docstore
+    finally:
+        if docstore is not None:
+            docstore.close()
+        if os.path.exists(scratch):
+            os.remove(scratch)
+
+def _sources(vectorstore):
+    """{url: {"doc_hash": ..., "chunks": {chunk hash: [docstore ids]}}} for every indexed chunk."""
+    if isinstance(vectorstore.docstore, SQLiteDocstore):
+        # Holds exactly the indexed chunks; read in one pass instead of a lookup per id
+        documents = vectorstore.docstore.iter_documents()
+    else:
+        documents = ((doc_id, vectorstore.docstore.search(doc_id)) for doc_id in vectorstore.index_to_docstore_id.values())
+    sources = {}
+    for doc_id, doc in documents:
+        url = doc.metadata.get("source")
+        entry = sources.setdefault(url, {"doc_hash": doc.metadata.get("doc_hash"), "chunks": {}})
+        chunk_hash = doc.metadata.get("chunk_hash") or _hash_text(doc.page_content)
+        entry["chunks"].setdefault(chunk_hash, []).append(doc_id)
+    return sources
+
+def _rebuild(vectorstore, exclude=(), kind=None, ann=None):
+    """
+    A tightly packed copy of vectorstore without the `exclude` ids, built from its
+    stored vectors without re-embedding (IVF-PQ only stores approximations of
+    them). The index keeps its type and trained quantizers unless `kind` names
+    another type, which is then trained afresh. The copy shares the docstore,
+    from which excluded ids are deleted.
+    """
+    exclude = set(exclude)
+    positions = sorted(vectorstore.index_to_docstore_id.items())
+    live = [(position, doc_id) for position, doc_id in positions if doc_id not in exclude]
+    if len(live) < len(positions):
+        vectorstore.docstore.delete([doc_id for _, doc_id in positions if doc_id in exclude])
+    vectors = ann_index.reconstruct_all(vectorstore.index)[[position for position, _ in live]]
+    if kind is None or kind == ann_index.index_kind(vectorstore.index):
+        index = ann_index.empty_like(vectorstore.index)
+        index.add(vectors)
+    else:
+        index = ann_index.build_index(vectors, **dict(ann or {}, kind=kind, metric=vectorstore.index.metric_type))
+    ids = [doc_id for _, doc_id in live]
+    return FAISS(
+        vectorstore.embedding_function,
+        index,
+        vectorstore.docstore,
+        dict(enumerate(ids)),
+        normalize_L2=vectorstore._normalize_L2,
+        distance_strategy=vectorstore.distance_strategy,
+    )
+
+def _delete(vectorstore, ids):
+    """
+    Remove ids from a private copy. The flat index deletes in place; IVF ids would
+    no longer line up with LangChain's positions after remove_ids and HNSW cannot
+    delete at all, so those are rebuilt without the ids.
+    """
+    if ann_index.index_kind(vectorstore.index) == ann_index.FLAT:
+        vectorstore.delete(ids)
+        return vectorstore
+    return _rebuild(vectorstore, exclude=ids)
+
+def _commit(vectorstore, index_dir, removed, compact, ann):
+    """
+    Publish a mutated private copy: switch index type if the corpus size calls for
+    another one, else compact it if requested or overdue.
+    """
+    ann = ann if ann is not None else ann_index.config_from_env()
+    pointer = _read_pointer(index_dir) or {}
+    live = vectorstore.index.ntotal
+    current = ann_index.index_kind(vectorstore.index)
+    # Only the flat index deletes in place; the others were already rebuilt by _delete
+    deleted = pointer.get("deleted_since_compaction", 0) + removed if current == ann_index.FLAT else 0
+    kind = ann_index.select_kind(live, vectorstore.index.d, current=current, **ann)
+    if kind != current:
+        vectorstore, deleted = _rebuild(vectorstore, kind=kind, ann=ann), 0
+    elif compact or (compact is None and deleted > COMPACT_RATIO * max(live, 1)):
+        vectorstore, deleted = _rebuild(vectorstore), 0
+    search_params = {"nprobe": ann.get("nprobe", ann_index.NPROBE), "ef_search": ann.get("ef_search", ann_index.EF_SEARCH)}
+    ann_index.set_search_params(vectorstore.index, **search_params)
+    return publish(vectorstore, index_dir, deleted_since_compaction=deleted, search_params=search_params)
+
+def update_documents(documents, embeddings, splitter, index_dir=INDEX_DIR, compact=None, ann=None):
+    """
+    Add or refresh whole source documents (one per URL, keyed by metadata["source"]).
+
+    A document whose text hash matches what is indexed for its URL is skipped.
+    Otherwise it is split, and only chunks whose content hash is not already
+    indexed for that URL are embedded; chunks that disappeared from the article
+    are deleted. Every chunk records its source URL, chunk hash and article hash.
+    Nothing is published if nothing changed.
+
+    compact=None compacts once deletions pass COMPACT_RATIO of the index,
+    True always compacts and False never does. ann holds ann_index settings
+    (index type, thresholds, nprobe, ef_search) and defaults to FYPY_ANN_*.
+
+    Returns a dict with the 'version' (None if unchanged) and counts of
+    'unchanged_urls', 'updated_urls', 'added_chunks', 'kept_chunks' and 'removed_chunks'.
+    """
+    summary = {"version": None, "unchanged_urls": 0, "updated_urls": 0,
+               "added_chunks": 0, "kept_chunks": 0, "removed_chunks": 0}
+    with _lock(index_dir), _private(embeddings, index_dir) as (vectorstore, docstore):
+        indexed = _sources(vectorstore) if vectorstore is not None else {}
+
+        new_docs, new_ids, stale_ids = [], [], []
+        for document in documents:
+            url = document.metadata.get("source")
+            doc_hash = _hash_text(document.page_content)
+            entry = indexed.get(url, {"doc_hash": None, "chunks": {}})
+            if entry["doc_hash"] == doc_hash:
+                summary["unchanged_urls"] += 1
+                continue
+            summary["updated_urls"] += 1
+
+            # Match chunks to indexed ones by content hash; repeated chunks match one-to-one
+            unused = {chunk_hash: list(ids) for chunk_hash, ids in entry["chunks"].items()}
+            kept_ids = []
+            for chunk in splitter.split_documents([document]):
+                chunk_hash = _hash_text(chunk.page_content)
+                if unused.get(chunk_hash):
+                    # Unchanged chunk: keep its vector, refresh the article hash
+                    kept_ids.append(unused[chunk_hash].pop(0))
+                    continue
+                chunk.metadata.update(source=url, chunk_hash=chunk_hash, doc_hash=doc_hash)
+                new_docs.append(chunk)
+                new_ids.append(uuid.uuid4().hex)
+            docstore.update_metadata(kept_ids, doc_hash=doc_hash)
+            summary["kept_chunks"] += len(kept_ids)
+            stale_ids.extend(doc_id for ids in unused.values() for doc_id in ids)
+
+        if not new_docs and not stale_ids:
+            if summary["updated_urls"] and vectorstore is not None:
+                # Only article hashes moved: republish so unchanged URLs are skipped next time
+                summary["version"] = _commit(vectorstore, index_dir, 0, compact, ann)
+            return summary
+
+        if stale_ids:
+            vectorstore = _delete(vectorstore, stale_ids)
+        if new_docs:
+            if vectorstore is None:
+                texts = [doc.page_content for doc in new_docs]
+                vectors = embeddings.embed_documents(texts)
+                vectorstore = FAISS(embeddings, faiss.IndexFlatL2(len(vectors[0])), docstore, {})
+                vectorstore.add_embeddings(zip(texts, vectors), [doc.metadata for doc in new_docs], ids=new_ids)
+            else:
+                vectorstore.add_documents(new_docs, ids=new_ids)
+        summary["added_chunks"], summary["removed_chunks"] = len(new_docs), len(stale_ids)
+        summary["version"] = _commit(vectorstore, index_dir, len(stale_ids), compact, ann)
+    return summary
+
+def remove_sources(urls, embeddings, index_dir=INDEX_DIR, compact=None, ann=None):
+    """Delete every chunk of the given source URLs. Returns (new version or None, removed chunk count)."""
+    urls = set(urls)
+    with _lock(index_dir), _private(embeddings, index_dir) as (vectorstore, _):
+        if vectorstore is None:
+            return None, 0
+        stale_ids = [doc_id for url, entry in _sources(vectorstore).items() if url in urls
+                     for ids in entry["chunks"].values() for doc_id in ids]
+        if not stale_ids:
+            return None, 0
+        vectorstore = _delete(vectorstore, stale_ids)
+        return _commit(vectorstore, index_dir, len(stale_ids), compact, ann), len(stale_ids)
+
+def compact(embeddings, index_dir=INDEX_DIR, ann=None):
+    """
+    Rebuild the published index from its stored vectors. Deletes free their rows
+    immediately but leave FAISS buffers at their high-water size; compaction
+    packs them tightly again without re-embedding anything.
+    """
+    with _lock(index_dir), _private(embeddings, index_dir) as (vectorstore, _):
+        if vectorstore is None:
+            return None
+        return _commit(vectorstore, index_dir, 0, True, ann)